@@ -1,11 +1,18 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import threading
+import time
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import logging
 
+from .rate_limit import SlidingWindowLimiter
+
 logger = logging.getLogger(__name__)
 
 # Security configuration
@@ -13,6 +20,13 @@ SECRET_KEY = "your-secret-key-change-this-in-production"  # Change this!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Verified-token cache (token -> (exp, username)), bounded LRU
+TOKEN_CACHE_SIZE = 1024
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+# Revoked tokens (token -> exp), pruned once they expire
+_revoked_tokens = {}
+_token_lock = threading.Lock()
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -28,16 +42,34 @@ DEMO_USERS = {
     "analyst": {"password": "analyst123", "role": "analyst"}
 }
 
-# Build user database with hashed passwords
-fake_users_db = {}
-for username, user_info in DEMO_USERS.items():
-    fake_users_db[username] = {
-        "username": username,
-        "password": get_password_hash(user_info["password"]),
-        "role": user_info["role"]
-    }
+# User database; password hashes are computed lazily on first login so that
+# importing this module doesn't pay for a bcrypt round per user
+fake_users_db = {
+    username: {"username": username, "password": None, "role": user_info["role"]}
+    for username, user_info in DEMO_USERS.items()
+}
+
+# Bounded pool for bcrypt so login never blocks the event loop
+HASH_WORKERS = 4
+HASH_QUEUE_LIMIT = 64
+_hash_pending = 0
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_lock = threading.Lock()
 
-logger.info("✅ Users database initialized with hashed passwords")
+# Failed-login limits per client IP and per username (15 minute window)
+LOGIN_WINDOW_SECONDS = 900
+login_ip_limiter = SlidingWindowLimiter(limit=20, window=LOGIN_WINDOW_SECONDS)
+login_user_limiter = SlidingWindowLimiter(limit=10, window=LOGIN_WINDOW_SECONDS)
+
+
+def _user_password_hash(user: dict) -> str:
+    """Return the user's bcrypt hash, hashing the demo password on first use"""
+    if user["password"] is None:
+        with _hash_lock:
+            if user["password"] is None:
+                user["password"] = get_password_hash(DEMO_USERS[user["username"]]["password"])
+                logger.info(f"✅ Password hash initialized for {user['username']}")
+    return user["password"]
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -48,13 +80,36 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def authenticate_user(username: str, password: str):
     """Authenticate user"""
     user = fake_users_db.get(username)
-    if not user or not verify_password(password, user["password"]):
+    if not user or not verify_password(password, _user_password_hash(user)):
         logger.warning(f"❌ Failed login attempt: {username}")
         return False
     logger.info(f"✅ Successful login: {username}")
     return user
 
 
+async def authenticate_user_async(username: str, password: str):
+    """Authenticate user with bcrypt offloaded to the hashing pool"""
+    global _hash_pending
+    if _hash_pending >= HASH_QUEUE_LIMIT:
+        raise HTTPException(status_code=503, detail="Login service busy, retry shortly")
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, authenticate_user, username, password)
+    finally:
+        _hash_pending -= 1
+
+
+def login_rate_limited(client_ip: str, username: str) -> bool:
+    """True if this IP or username has too many recent failed logins"""
+    return login_ip_limiter.is_limited(client_ip) or login_user_limiter.is_limited(username)
+
+
+def record_failed_login(client_ip: str, username: str):
+    login_ip_limiter.hit(client_ip)
+    login_user_limiter.hit(username)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT token"""
     to_encode = data.copy()
@@ -67,6 +122,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def _cached_username(token: str, now: float) -> Optional[str]:
+    """Return the username for a previously verified, unexpired token"""
+    with _token_lock:
+        entry = _token_cache.get(token)
+        if entry is None:
+            return None
+        exp, username = entry
+        if exp <= now:
+            del _token_cache[token]
+            return None
+        _token_cache.move_to_end(token)
+        return username
+
+
+def _cache_token(token: str, exp: float, username: str):
+    with _token_lock:
+        _token_cache[token] = (exp, username)
+        _token_cache.move_to_end(token)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+
+def revoke_token(token: str):
+    """Revoke a token (logout) and drop it from the verification cache"""
+    try:
+        exp = float(jwt.get_unverified_claims(token).get("exp", 0))
+    except JWTError:
+        exp = 0.0
+    now = time.time()
+    with _token_lock:
+        _token_cache.pop(token, None)
+        if exp > now:
+            _revoked_tokens[token] = exp
+        # Expired tokens are rejected by jwt.decode anyway
+        for revoked, revoked_exp in list(_revoked_tokens.items()):
+            if revoked_exp <= now:
+                del _revoked_tokens[revoked]
+
+
+def clear_token_cache():
+    """Drop all cached verifications (e.g. after a user or key change)"""
+    with _token_lock:
+        _token_cache.clear()
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get current user from token"""
     credential_exception = HTTPException(
@@ -74,13 +174,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credential_exception
-    except JWTError:
+    if token in _revoked_tokens:
         raise credential_exception
+
+    now = time.time()
+    username = _cached_username(token, now)
+    if username is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username = payload.get("sub")
+            if username is None:
+                raise credential_exception
+        except JWTError:
+            raise credential_exception
+        _cache_token(token, float(payload.get("exp", now)), username)
     
     user = fake_users_db.get(username)
     if user is None:
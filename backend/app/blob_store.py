@@ -0,0 +1,187 @@
+"""
+Content-Addressed Blob Store for HoneyCloud-X
+Deduplicates large attacker payloads: each distinct blob is stored once
+under its SHA-256, events reference it by hash, and classification verdicts
+are cached per blob so identical content is only scored once.
+
+Blobs larger than COMPRESS_THRESHOLD are compressed on disk (zstd when the
+optional `zstandard` package is installed, zlib otherwise). Reference
+counts and verdicts are kept in memory and saved to refs.json on flush(),
+which the API calls periodically; get() falls back to the blob file itself
+for content written after the last flush.
+
+Content that stays inline on the event (commands, short payloads) is not
+written to disk: only its verdict is cached, in a bounded in-memory map
+keyed by the same hash.
+
+Events are never deleted (the event log has no retention), so blobs are
+kept for good and `refs` only counts how many events point at each one.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = os.getenv("HONEYCLOUD_BLOB_DIR", "data/blobs")
+COMPRESS_THRESHOLD = 1024
+# Verdicts kept for inline (not stored) content
+MAX_INLINE_VERDICTS = 100000
+
+_DIGEST = re.compile(r'[0-9a-f]{64}')
+
+# One-byte codec prefix on every blob file
+_RAW, _ZLIB, _ZSTD = b'r', b'z', b's'
+
+
+class BlobStore:
+    def __init__(self, directory: str = BLOB_DIR, compress_threshold: int = COMPRESS_THRESHOLD):
+        self.directory = directory
+        self.compress_threshold = compress_threshold
+        # digest -> {'refs', 'size', 'stored', 'verdict'}
+        self._meta: Dict[str, dict] = {}
+        # digest -> verdict for inline content, least recently used first
+        self._inline_verdicts: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._refs_path = os.path.join(directory, 'refs.json')
+        self._load_refs()
+
+    def _load_refs(self):
+        if os.path.exists(self._refs_path):
+            try:
+                with open(self._refs_path, encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ Could not read blob refcounts: {e}")
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest[2:4], digest)
+
+    def _encode(self, data: bytes) -> bytes:
+        if len(data) < self.compress_threshold:
+            return _RAW + data
+        if zstandard is not None:
+            return _ZSTD + zstandard.ZstdCompressor(level=6).compress(data)
+        return _ZLIB + zlib.compress(data, 6)
+
+    @staticmethod
+    def _decode(stored: bytes) -> bytes:
+        codec, body = stored[:1], stored[1:]
+        if codec == _ZSTD:
+            return zstandard.ZstdDecompressor().decompress(body)
+        if codec == _ZLIB:
+            return zlib.decompress(body)
+        return body
+
+    def put(self, data: bytes) -> str:
+        """Store `data` (or add a reference to the existing copy); returns its hash"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._dirty = True
+            meta = self._meta.get(digest)
+            if meta is not None:
+                meta['refs'] += 1
+                return digest
+            encoded = self._encode(data)
+            path = self._path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(encoded)
+            self._meta[digest] = {'refs': 1, 'size': len(data), 'stored': len(encoded), 'verdict': None}
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        if not _DIGEST.fullmatch(digest):
+            return None
+        # Not in _meta: stored after the last refcount flush and before a crash
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return self._decode(f.read())
+        except FileNotFoundError:
+            return None
+
+    def classify(self, digest: str, data: bytes, classifier: Callable[[bytes], str]) -> str:
+        """Return the cached verdict for a blob, running `classifier` only the first time"""
+        meta = self._meta.get(digest)
+        if meta is not None and meta['verdict'] is not None:
+            return meta['verdict']
+        verdict = classifier(data)
+        if meta is not None:
+            meta['verdict'] = verdict
+            self._dirty = True
+        return verdict
+
+    def intern(self, text: str, classifier: Callable[[bytes], str]) -> Tuple[str, str]:
+        """Store a text blob and classify it once; returns (digest, verdict)"""
+        data = text.encode('utf-8', errors='surrogateescape')
+        digest = self.put(data)
+        return digest, self.classify(digest, data, classifier)
+
+    def verdict(self, text: str, classifier: Callable[[bytes], str]) -> Tuple[str, str]:
+        """Hash and classify content the caller keeps inline, without storing it"""
+        data = text.encode('utf-8', errors='surrogateescape')
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            verdict = self._inline_verdicts.get(digest)
+            if verdict is not None:
+                self._inline_verdicts.move_to_end(digest)
+                return digest, verdict
+            meta = self._meta.get(digest)
+            if meta is not None and meta['verdict'] is not None:
+                return digest, meta['verdict']
+        verdict = classifier(data)
+        with self._lock:
+            self._inline_verdicts[digest] = verdict
+            while len(self._inline_verdicts) > MAX_INLINE_VERDICTS:
+                self._inline_verdicts.popitem(last=False)
+        return digest, verdict
+
+    def stats(self) -> dict:
+        """Deduplication report"""
+        with self._lock:
+            metas = list(self._meta.values())
+            inline_verdicts = len(self._inline_verdicts)
+        references = sum(m['refs'] for m in metas)
+        logical = sum(m['size'] * m['refs'] for m in metas)
+        unique = sum(m['size'] for m in metas)
+        stored = sum(m['stored'] for m in metas)
+        return {
+            'blobs': len(metas),
+            'references': references,
+            'logical_bytes': logical,
+            'unique_bytes': unique,
+            'stored_bytes': stored,
+            'dedup_ratio': round(logical / unique, 2) if unique else 1.0,
+            'compression_ratio': round(unique / stored, 2) if stored else 1.0,
+            'bytes_saved': logical - stored,
+            'inline_verdicts_cached': inline_verdicts,
+            'codec': 'zstd' if zstandard is not None else 'zlib',
+        }
+
+    def flush(self):
+        """Persist reference counts and verdicts (no-op if nothing changed)"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            if not self._dirty and os.path.exists(self._refs_path):
+                return
+            snapshot = json.dumps(self._meta)
+            self._dirty = False
+        tmp = self._refs_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(tmp, self._refs_path)
+
+
+blob_store = BlobStore()
@@ -0,0 +1,48 @@
+"""
+Event Broadcasting for HoneyCloud-X
+Fans pipeline output out to connected SSE clients. Each subscriber gets its
+own bounded queue; a slow client loses its oldest events instead of
+stalling the pipeline.
+"""
+import asyncio
+import logging
+from typing import List, Set
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class Broadcaster:
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        metrics.sse_subscribers.inc()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            metrics.sse_subscribers.dec()
+
+    def publish(self, events: List[dict]):
+        """Hand a batch of events to every subscriber without waiting"""
+        for queue in self._subscribers:
+            for event in events:
+                if queue.full():
+                    queue.get_nowait()
+                    self.dropped += 1
+                queue.put_nowait(event)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+broadcaster = Broadcaster()
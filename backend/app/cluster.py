@@ -0,0 +1,442 @@
+"""
+Cluster Mode for HoneyCloud-X
+Many sensor nodes, one aggregator. Set HONEYCLOUD_ROLE on each process:
+
+    standalone  - default, a single self-contained node
+    sensor      - runs detection locally and forwards every stored event to
+                  HONEYCLOUD_AGGREGATOR_URL in compressed NDJSON batches
+    aggregator  - accepts batches on POST /api/cluster/batches and feeds them
+                  into its own store, so the dashboard API shows all sensors
+
+Batches are zstd-compressed when the optional `zstandard` package is
+installed (zlib otherwise) and carry a per-sensor sequence number plus a
+random boot epoch, so a retried batch is acknowledged but not stored twice
+and a restarted sensor (whose sequence starts again at 1) is not mistaken
+for a stream of retries. The aggregator keeps
+per-node rollups (counts plus a HyperLogLog of source IPs) updated as
+batches arrive; the cluster-wide view merges those small rollups instead
+of re-scanning events.
+
+Transports are pluggable: HttpTransport between processes, LocalTransport
+to wire a Forwarder straight to an in-process Aggregator. The aggregator
+endpoint takes at most MAX_WIRE_BYTES per batch and only accepts admin
+accounts; sensors log in with HONEYCLOUD_CLUSTER_USERNAME/PASSWORD.
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .sketches import HyperLogLog
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CLUSTER_ROLE = os.getenv("HONEYCLOUD_ROLE", "standalone")
+NODE_ID = os.getenv("HONEYCLOUD_NODE_ID", socket.gethostname())
+AGGREGATOR_URL = os.getenv("HONEYCLOUD_AGGREGATOR_URL", "http://127.0.0.1:8000")
+CLUSTER_USERNAME = os.getenv("HONEYCLOUD_CLUSTER_USERNAME", "admin")
+CLUSTER_PASSWORD = os.getenv("HONEYCLOUD_CLUSTER_PASSWORD", "admin123")
+
+FORWARD_BATCH_SIZE = 1000
+FORWARD_INTERVAL = 1.0
+# Events buffered on a sensor while the aggregator is unreachable
+MAX_PENDING_EVENTS = 200000
+MAX_BACKOFF = 30.0
+MAX_BATCH_BYTES = 64 * 1024 * 1024
+# Compressed size accepted by the aggregator endpoint
+MAX_WIRE_BYTES = 16 * 1024 * 1024
+# Answers about the batch itself: resending it cannot succeed. Auth and
+# role errors (401/403/404) are configuration problems and stay retryable
+PERMANENT_HTTP_CODES = (400, 413, 415, 422)
+
+
+class ClusterError(Exception):
+    """Raised when a batch cannot be delivered or decoded"""
+
+
+class PermanentClusterError(ClusterError):
+    """The aggregator refused a batch for good; resending it cannot succeed"""
+
+
+# Field types the aggregator's store (event log, sessions, stats) relies on
+_REQUIRED_TEXT = ('source_ip', 'service', 'severity')
+_OPTIONAL_TEXT = ('timestamp', 'username', 'password', 'payload', 'command', 'user_agent',
+                  'ai_label', 'sensor_id', 'payload_hash', 'command_hash')
+
+
+def check_event(event) -> Optional[str]:
+    """Why a forwarded event cannot be stored, or None if it is well formed"""
+    if not isinstance(event, dict):
+        return "event is not an object"
+    for field in _REQUIRED_TEXT:
+        if not isinstance(event.get(field), str):
+            return f"{field}: missing or not a string"
+    for field in _OPTIONAL_TEXT:
+        if event.get(field) is not None and not isinstance(event[field], str):
+            return f"{field}: not a string"
+    for field in ('id', 'source_port'):
+        value = event.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            return f"{field}: not an integer"
+    score = event.get('threat_score')
+    if score is not None and (isinstance(score, bool) or not isinstance(score, (int, float))):
+        return "threat_score: not a number"
+    if event.get('geolocation') is not None and not isinstance(event['geolocation'], dict):
+        return "geolocation: not an object"
+    return None
+
+
+# ====================================
+# WIRE FORMAT
+# ====================================
+
+def compress(payload: bytes) -> Tuple[bytes, str]:
+    """Compress an NDJSON payload; returns (body, content encoding)"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(payload), 'zstd'
+    return zlib.compress(payload, 6), 'deflate'
+
+
+def decompress(body: bytes, encoding: str, limit: int = MAX_BATCH_BYTES) -> bytes:
+    """Inverse of compress(), refusing batches that inflate beyond `limit`"""
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise ClusterError("zstd batch received but zstandard is not installed")
+        payload = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body)).read(limit + 1)
+    elif encoding == 'deflate':
+        inflater = zlib.decompressobj()
+        payload = inflater.decompress(body, limit + 1)
+    elif encoding in ('', 'identity'):
+        payload = body
+    else:
+        raise ClusterError(f"Unsupported batch encoding: {encoding}")
+    if len(payload) > limit:
+        raise ClusterError(f"Batch exceeds {limit} bytes uncompressed")
+    return payload
+
+
+# ====================================
+# AGGREGATOR
+# ====================================
+
+class NodeRollup:
+    """Running totals for one sensor, updated per batch"""
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self.events = 0
+        self.batches = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self.last_seq = 0
+        self.epoch = None
+        self.restarts = 0
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+        self.by_service: Dict[str, int] = {}
+        self.by_severity: Dict[str, int] = {}
+        self.by_label: Dict[str, int] = {}
+        self.sources = HyperLogLog()
+
+    def add(self, event: dict):
+        self.events += 1
+        for counts, key in ((self.by_service, 'service'), (self.by_severity, 'severity'), (self.by_label, 'ai_label')):
+            value = event.get(key) or 'unknown'
+            counts[value] = counts.get(value, 0) + 1
+        if event.get('source_ip'):
+            self.sources.add(event['source_ip'])
+
+    def to_dict(self) -> dict:
+        return {
+            'node_id': self.node_id,
+            'events': self.events,
+            'batches': self.batches,
+            'duplicate_batches': self.duplicates,
+            'rejected_events': self.rejected,
+            'last_seq': self.last_seq,
+            'epoch': self.epoch,
+            'restarts': self.restarts,
+            'unique_sources': self.sources.count(),
+            'compression_ratio': round(self.raw_bytes / self.wire_bytes, 2) if self.wire_bytes else None,
+            'first_seen': self.first_seen,
+            'last_seen': self.last_seen,
+            'seconds_since_last_batch': round(time.time() - self.last_seen, 1),
+            'events_by_service': dict(self.by_service),
+            'events_by_severity': dict(self.by_severity),
+            'ai_labels': dict(self.by_label),
+        }
+
+
+class Aggregator:
+    """Receives sensor batches, keeps per-node rollups and hands events to `sink`"""
+
+    def __init__(self, sink: Callable[[List[dict]], Awaitable]):
+        self.sink = sink
+        self.nodes: Dict[str, NodeRollup] = {}
+
+    async def receive(self, node_id: str, seq: int, body: bytes, encoding: str, epoch: str = '') -> dict:
+        """
+        Store one compressed batch from a sensor. `epoch` identifies the
+        sensor process; sequence numbers are only compared within one epoch.
+
+        Returns:
+            Acknowledgement dict ({'node_id', 'seq', 'accepted', 'rejected', 'duplicate'})
+        """
+        payload = await asyncio.to_thread(decompress, body, encoding)
+        # Malformed lines are rejected one by one, before any rollup counts them
+        events, rejected = [], []
+        for index, line in enumerate(l for l in payload.splitlines() if l.strip()):
+            try:
+                event = json.loads(line)
+            except ValueError as e:
+                rejected.append({'index': index, 'error': f"invalid JSON: {e}"})
+                continue
+            error = check_event(event)
+            if error:
+                rejected.append({'index': index, 'error': error})
+            else:
+                events.append(event)
+
+        # No awaits from the sequence check to the rollup update, so a retry
+        # arriving while the original is still decoding cannot be stored twice
+        rollup = self.nodes.get(node_id)
+        if rollup is None:
+            rollup = self.nodes[node_id] = NodeRollup(node_id)
+        if epoch != rollup.epoch:
+            # Sensor restarted: its sequence numbers begin again
+            if rollup.epoch is not None:
+                rollup.restarts += 1
+                logger.info(f"🔄 Sensor {node_id} restarted (epoch {epoch or 'none'}), resetting batch sequence")
+            rollup.epoch = epoch
+            rollup.last_seq = 0
+        if seq and seq <= rollup.last_seq:
+            # Sensor retried a batch we already stored
+            rollup.duplicates += 1
+            return {'node_id': node_id, 'seq': seq, 'accepted': 0, 'rejected': 0, 'duplicate': True}
+
+        for event in events:
+            # Sensor-local ids collide across nodes; the aggregator assigns its own
+            event['sensor_event_id'] = event.pop('id', None)
+            event['node_id'] = node_id
+            rollup.add(event)
+
+        if rejected:
+            rollup.rejected += len(rejected)
+            logger.warning(f"⚠️ Batch {seq} from {node_id}: rejected {len(rejected)} malformed event(s), "
+                           f"first: {rejected[0]['error']}")
+        rollup.batches += 1
+        rollup.raw_bytes += len(payload)
+        rollup.wire_bytes += len(body)
+        rollup.last_seq = max(rollup.last_seq, seq)
+        rollup.last_seen = time.time()
+        if events:
+            await self.sink(events)
+        return {'node_id': node_id, 'seq': seq, 'accepted': len(events), 'rejected': len(rejected),
+                'errors': rejected[:100], 'duplicate': False}
+
+    def summary(self) -> dict:
+        """Cluster-wide view merged from the per-node rollups"""
+        sources = HyperLogLog()
+        totals = {'events_by_service': {}, 'events_by_severity': {}, 'ai_labels': {}}
+        nodes = []
+        for rollup in self.nodes.values():
+            sources.merge(rollup.sources)
+            node = rollup.to_dict()
+            for field, counts in totals.items():
+                for key, count in node[field].items():
+                    counts[key] = counts.get(key, 0) + count
+            nodes.append(node)
+        return {
+            'nodes': len(nodes),
+            'events': sum(n['events'] for n in nodes),
+            'unique_sources': sources.count(),
+            **totals,
+            'per_node': sorted(nodes, key=lambda n: n['node_id']),
+        }
+
+
+# ====================================
+# TRANSPORTS
+# ====================================
+
+class LocalTransport:
+    """Delivers batches to an Aggregator in the same process (testing stand-in)"""
+
+    def __init__(self, aggregator: Aggregator):
+        self.aggregator = aggregator
+
+    async def send(self, node_id: str, seq: int, body: bytes, encoding: str, epoch: str = '') -> dict:
+        try:
+            return await self.aggregator.receive(node_id, seq, body, encoding, epoch)
+        except ClusterError as e:
+            # What the HTTP endpoint answers with 400
+            raise PermanentClusterError(str(e))
+
+
+class HttpTransport:
+    """POSTs batches to an aggregator's /api/cluster/batches"""
+
+    def __init__(self, base_url: str = AGGREGATOR_URL, username: str = CLUSTER_USERNAME,
+                 password: str = CLUSTER_PASSWORD, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._token = None
+
+    def _login(self) -> str:
+        data = urllib.parse.urlencode({"username": self.username, "password": self.password}).encode()
+        with urllib.request.urlopen(f"{self.base_url}/auth/login", data=data, timeout=self.timeout) as response:
+            return json.loads(response.read())["access_token"]
+
+    def _post(self, node_id: str, seq: int, body: bytes, encoding: str, epoch: str) -> dict:
+        if self._token is None:
+            self._token = self._login()
+        request = urllib.request.Request(
+            f"{self.base_url}/api/cluster/batches", data=body,
+            headers={
+                "Authorization": f"Bearer {self._token}",
+                "Content-Type": "application/x-ndjson",
+                "Content-Encoding": encoding,
+                "X-Node-Id": node_id,
+                "X-Node-Epoch": epoch,
+                "X-Batch-Seq": str(seq),
+            },
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 401:
+                # Token expired or revoked: log in again on the next attempt
+                self._token = None
+            if e.code in PERMANENT_HTTP_CODES:
+                raise PermanentClusterError(f"Aggregator rejected batch {seq}: HTTP {e.code}")
+            raise ClusterError(f"Aggregator rejected batch {seq}: HTTP {e.code}")
+        except OSError as e:
+            raise ClusterError(f"Aggregator unreachable: {e}")
+
+    async def send(self, node_id: str, seq: int, body: bytes, encoding: str, epoch: str = '') -> dict:
+        return await asyncio.to_thread(self._post, node_id, seq, body, encoding, epoch)
+
+
+# ====================================
+# SENSOR SIDE
+# ====================================
+
+class Forwarder:
+    """Buffers serialized events on a sensor and ships them in compressed batches"""
+
+    def __init__(self, node_id: str, transport, batch_size: int = FORWARD_BATCH_SIZE,
+                 interval: float = FORWARD_INTERVAL, max_pending: int = MAX_PENDING_EVENTS):
+        self.node_id = node_id
+        self.transport = transport
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: deque = deque(maxlen=max_pending)
+        # Batch taken off the queue and not yet acknowledged, with its seq
+        self._inflight: Optional[Tuple[int, List[bytes]]] = None
+        self._flush_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        # New per process: the aggregator resets its dedupe sequence on change
+        self.epoch = uuid.uuid4().hex
+        self._seq = 0
+        self.sent_events = 0
+        self.sent_batches = 0
+        self.dropped = 0
+        self.rejected_batches = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def enqueue(self, payloads: List[bytes]):
+        """Queue JSON-encoded events (oldest are dropped if the buffer is full)"""
+        overflow = len(self._pending) + len(payloads) - self._pending.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+        self._pending.extend(payloads)
+        if len(self._pending) >= self.batch_size:
+            self._ready.set()
+
+    def has_pending(self) -> bool:
+        return self._inflight is not None or bool(self._pending)
+
+    async def flush(self) -> bool:
+        """Send one batch; on failure it is kept and retried under the same seq"""
+        async with self._flush_lock:
+            if self._inflight is None:
+                if not self._pending:
+                    return True
+                # Taken off the queue before any await, so overflow while the
+                # send is in flight can only drop events that are still queued
+                count = min(len(self._pending), self.batch_size)
+                self._inflight = (self._seq + 1, [self._pending.popleft() for _ in range(count)])
+                self._seq += 1
+            seq, lines = self._inflight
+            body, encoding = await asyncio.to_thread(compress, b'\n'.join(lines))
+            try:
+                await self.transport.send(self.node_id, seq, body, encoding, self.epoch)
+            except PermanentClusterError as e:
+                # Retrying the same seq would stall this sensor forever
+                self._inflight = None
+                self.rejected_batches += 1
+                self.dropped += len(lines)
+                self.last_error = str(e)
+                logger.error(f"❌ Aggregator refused batch {seq} ({len(lines)} events), dropping it: {e}")
+                return True
+            except ClusterError as e:
+                self.failures += 1
+                self.last_error = str(e)
+                return False
+            self._inflight = None
+            self.sent_events += len(lines)
+            self.sent_batches += 1
+            return True
+
+    async def run(self):
+        """Background loop: flush when a batch fills up or every `interval` seconds"""
+        backoff = self.interval
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            while self.has_pending():
+                if not await self.flush():
+                    logger.warning(f"⚠️ Forwarding to aggregator failed, retrying in {backoff:.1f}s: {self.last_error}")
+                    backoff = min(MAX_BACKOFF, backoff * 2)
+                    break
+                backoff = self.interval
+                if len(self._pending) < self.batch_size:
+                    break
+
+    def stats(self) -> dict:
+        return {
+            'node_id': self.node_id,
+            'pending': len(self._pending) + (len(self._inflight[1]) if self._inflight else 0),
+            'epoch': self.epoch,
+            'sent_events': self.sent_events,
+            'sent_batches': self.sent_batches,
+            'last_seq': self._seq,
+            'dropped': self.dropped,
+            'rejected_batches': self.rejected_batches,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
@@ -1,5 +1,7 @@
 # SQLAlchemy setup (placeholder)
 from sqlalchemy import create_engine
+from sqlalchemy.orm import declarative_base
 
 DATABASE_URL = "sqlite:///./honeycloud.db"
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+Base = declarative_base()
@@ -0,0 +1,330 @@
+"""
+Binary Event Log for HoneyCloud-X
+Append-only, segmented log of raw attack events for forensics and replay.
+
+Record layout (little endian):
+    u32 length | u32 crc32(body) | body
+    body = i64 id | i64 timestamp_us | i32 source_port | f64 threat_score
+           | 12 x (u32 length + utf-8 bytes, 0xFFFFFFFF for None)
+           | [u32 length + JSON object of every other field]
+
+The trailing extras section keeps fields added after the format was fixed
+(sensor_id, reputation, node_id, sensor_event_id, ...). Records written
+before it existed simply end after the string fields.
+
+Each segment ``<first_seq>.log`` has a sparse sidecar index ``<first_seq>.idx``
+with one entry per block of INDEX_EVERY records: (offset, min_ts, max_ts).
+Readers memory-map segments, skip blocks outside a time range using the
+index and scan the unindexed tail directly.
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_DIR = os.getenv("HONEYCLOUD_EVENT_LOG_DIR", "data/eventlog")
+SEGMENT_BYTES = 64 * 1024 * 1024
+INDEX_EVERY = 1024
+FSYNC_INTERVAL = 1.0
+
+_HEADER = struct.Struct('<II')
+_FIXED = struct.Struct('<qqid')
+_STRLEN = struct.Struct('<I')
+_INDEX = struct.Struct('<Qqq')
+_NONE = 0xFFFFFFFF
+
+STRING_FIELDS = (
+    'service', 'source_ip', 'username', 'password', 'payload',
+    'command', 'severity', 'ai_label', 'user_agent', 'geolocation',
+    'payload_hash', 'command_hash',
+)
+
+
+def _timestamp_us(value) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1_000_000)
+    if isinstance(value, str):
+        try:
+            return int(datetime.fromisoformat(value).timestamp() * 1_000_000)
+        except ValueError:
+            pass
+    return int(time.time() * 1_000_000)
+
+
+_FIXED_FIELDS = ('id', 'timestamp', 'source_port', 'threat_score')
+
+
+def encode_event(event: dict) -> bytes:
+    """Serialize an event dict into a record body"""
+    parts = [_FIXED.pack(
+        int(event.get('id') or 0),
+        _timestamp_us(event.get('timestamp')),
+        int(event.get('source_port') or 0),
+        float(event.get('threat_score') or 0.0),
+    )]
+    for field in STRING_FIELDS:
+        value = event.get(field)
+        if value is None:
+            parts.append(_STRLEN.pack(_NONE))
+            continue
+        if field == 'geolocation':
+            value = json.dumps(value, separators=(',', ':'))
+        data = str(value).encode('utf-8', errors='replace')
+        parts.append(_STRLEN.pack(len(data)))
+        parts.append(data)
+    extras = {
+        k: v for k, v in event.items()
+        if v is not None and k not in _FIXED_FIELDS and k not in STRING_FIELDS
+    }
+    if extras:
+        data = json.dumps(extras, separators=(',', ':'), default=str).encode('utf-8')
+        parts.append(_STRLEN.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def decode_event(buf, offset: int = 0, length: Optional[int] = None) -> dict:
+    """Deserialize a record body of `length` bytes (default: to the end of `buf`) at `offset`"""
+    end = len(buf) if length is None else offset + length
+    event_id, ts_us, port, score = _FIXED.unpack_from(buf, offset)
+    pos = offset + _FIXED.size
+    event = {
+        'id': event_id,
+        'timestamp': datetime.fromtimestamp(ts_us / 1_000_000).isoformat(),
+        'source_port': port,
+        'threat_score': score,
+    }
+    for field in STRING_FIELDS:
+        (size,) = _STRLEN.unpack_from(buf, pos)
+        pos += _STRLEN.size
+        if size == _NONE:
+            continue
+        value = bytes(buf[pos:pos + size]).decode('utf-8')
+        pos += size
+        event[field] = json.loads(value) if field == 'geolocation' else value
+    if pos < end:
+        (size,) = _STRLEN.unpack_from(buf, pos)
+        pos += _STRLEN.size
+        extras = json.loads(bytes(buf[pos:pos + size]))
+        # Fixed fields win over anything smuggled into extras
+        event = {**extras, **event}
+    return event
+
+
+def _record_timestamp(buf, offset: int) -> int:
+    return struct.unpack_from('<q', buf, offset + 8)[0]
+
+
+class EventLogWriter:
+    """
+    Appends events to rolling segments. append() only writes to the OS page
+    cache; a background thread flushes and fsyncs every `fsync_interval`
+    seconds, so callers on the event loop never wait on the disk.
+    """
+
+    def __init__(self, directory: str = EVENT_LOG_DIR, segment_bytes: int = SEGMENT_BYTES,
+                 fsync_interval: float = FSYNC_INTERVAL):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._log = None
+        self._index = None
+        self._seq = 0
+        self._block = None
+        # Rolled-over segment files waiting for their final fsync and close
+        self._retired = []
+        self._stop = threading.Event()
+        os.makedirs(directory, exist_ok=True)
+        self._open_next_segment()
+        self._syncer = threading.Thread(target=self._sync_loop, name="eventlog-fsync", daemon=True)
+        self._syncer.start()
+
+    def _open_next_segment(self):
+        segments = list_segments(self.directory)
+        if segments and self._log is None:
+            # Continue numbering after the newest segment's records
+            last = segments[-1]
+            self._seq = int(os.path.basename(last)[:-4]) + count_records(last)
+        self._retire_segment()
+        base = os.path.join(self.directory, f"{self._seq:020d}")
+        self._log = open(base + ".log", "ab")
+        self._index = open(base + ".idx", "ab")
+        self._block = None
+
+    def _retire_segment(self):
+        """Hand the current segment to the sync thread (lock held)"""
+        if self._log is None:
+            return
+        self._flush_block()
+        self._log.flush()
+        self._index.flush()
+        self._retired.append((self._log, self._index))
+        self._log = self._index = None
+
+    def _flush_block(self):
+        if self._block:
+            self._index.write(_INDEX.pack(*self._block[:3]))
+            self._block = None
+
+    def _sync(self):
+        """Flush buffers under the lock, fsync outside it"""
+        with self._lock:
+            retired, self._retired = self._retired, []
+            fds = []
+            if self._log is not None:
+                self._log.flush()
+                self._index.flush()
+                # Duplicated so a concurrent rollover cannot close them mid-fsync
+                fds = [os.dup(self._log.fileno()), os.dup(self._index.fileno())]
+        for log, index in retired:
+            for f in (log, index):
+                os.fsync(f.fileno())
+                f.close()
+        for fd in fds:
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.fsync_interval):
+            try:
+                self._sync()
+            except OSError as e:
+                logger.error(f"❌ Event log fsync failed: {e}")
+
+    def append(self, event: dict):
+        body = encode_event(event)
+        record = _HEADER.pack(len(body), zlib.crc32(body)) + body
+        ts_us = _FIXED.unpack_from(body)[1]
+
+        with self._lock:
+            if self._log.tell() + len(record) > self.segment_bytes and self._log.tell() > 0:
+                self._open_next_segment()
+            offset = self._log.tell()
+            self._log.write(record)
+            self._seq += 1
+
+            if self._block is None:
+                self._block = [offset, ts_us, ts_us, 0]
+            block = self._block
+            block[1] = min(block[1], ts_us)
+            block[2] = max(block[2], ts_us)
+            block[3] += 1
+            if block[3] >= INDEX_EVERY:
+                self._flush_block()
+
+    def flush(self):
+        self._sync()
+
+    def close(self):
+        """Stop the sync thread and fsync everything (blocking)"""
+        self._stop.set()
+        self._syncer.join()
+        with self._lock:
+            self._retire_segment()
+        self._sync()
+
+
+def list_segments(directory: str) -> List[str]:
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith('.log')
+    )
+
+
+def _read_index(segment: str) -> List[Tuple[int, int, int]]:
+    path = segment[:-4] + '.idx'
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % _INDEX.size
+    return [_INDEX.unpack_from(data, pos) for pos in range(0, usable, _INDEX.size)]
+
+
+def _scan(buf, start: int, end: int, segment: str) -> Iterator[Tuple[int, int]]:
+    """Yield (body_offset, body_length) for valid records in buf[start:end]"""
+    pos = start
+    while pos + _HEADER.size <= end:
+        length, crc = _HEADER.unpack_from(buf, pos)
+        body = pos + _HEADER.size
+        if body + length > end or zlib.crc32(buf[body:body + length]) != crc:
+            logger.warning(f"Event log {segment}: torn or corrupt record at offset {pos}, stopping")
+            return
+        yield body, length
+        pos = body + length
+
+
+@contextmanager
+def _mapped(path: str):
+    """Memory-map a segment read-only, yielding a memoryview (None if empty)"""
+    if os.path.getsize(path) == 0:
+        yield None
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+def count_records(segment: str) -> int:
+    with _mapped(segment) as buf:
+        if buf is None:
+            return 0
+        return sum(1 for _ in _scan(buf, 0, len(buf), segment))
+
+
+def _ranges(segment: str, size: int, start_us: Optional[int], end_us: Optional[int]):
+    """Byte ranges of a segment that may hold records in [start_us, end_us]"""
+    index = _read_index(segment)
+    if not index:
+        return [(0, size)]
+    ranges = []
+    for (offset, lo, hi), (next_offset, _, _) in zip(index, index[1:]):
+        if (start_us is not None and hi < start_us) or (end_us is not None and lo > end_us):
+            continue
+        ranges.append((offset, next_offset))
+    # The last indexed block and any unindexed tail are always scanned
+    ranges.append((index[-1][0], size))
+    return ranges
+
+
+class EventLogReader:
+    """Zero-copy sequential reader over memory-mapped segments"""
+
+    def __init__(self, directory: str = EVENT_LOG_DIR):
+        self.directory = directory
+
+    def scan(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[dict]:
+        """Yield events in log order, optionally restricted to a time range"""
+        start_us = int(since.timestamp() * 1_000_000) if since else None
+        end_us = int(until.timestamp() * 1_000_000) if until else None
+
+        for segment in list_segments(self.directory):
+            with _mapped(segment) as buf:
+                if buf is None:
+                    continue
+                for lo, hi in _ranges(segment, len(buf), start_us, end_us):
+                    for body, length in _scan(buf, lo, hi, segment):
+                        ts = _record_timestamp(buf, body)
+                        if start_us is not None and ts < start_us:
+                            continue
+                        if end_us is not None and ts > end_us:
+                            continue
+                        yield decode_event(buf, body, length)
@@ -0,0 +1,187 @@
+"""
+GeoIP / ASN Enrichment for HoneyCloud-X
+Offline IP-range lookups for the `geolocation` field - no network calls.
+
+The database is a CSV of ranges:
+    start_ip,end_ip,country,asn,as_org
+(IPs dotted/colon notation or integers). Ranges are loaded into sorted
+parallel arrays (array('I') for IPv4, lists of ints for IPv6) and looked up
+with binary search; distinct (country, asn, as_org) tuples are interned so
+each range costs ~12 bytes for IPv4. A MaxMind .mmdb file is also accepted
+when the optional `maxminddb` package is installed.
+"""
+import csv
+import ipaddress
+import logging
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, Optional
+
+try:
+    import maxminddb
+except ImportError:
+    maxminddb = None
+
+logger = logging.getLogger(__name__)
+
+GEOIP_DB_PATH = os.getenv("HONEYCLOUD_GEOIP_DB", "data/geoip/ip-ranges.csv")
+LOOKUP_CACHE_SIZE = 65536
+
+
+def _to_int(value: str) -> int:
+    value = value.strip()
+    return int(value) if value.isdigit() else int(ipaddress.ip_address(value))
+
+
+class GeoIPIndex:
+    """Sorted range index with binary-search lookup"""
+
+    def __init__(self):
+        self.v4_starts = array('I')
+        self.v4_ends = array('I')
+        self.v4_values = array('I')
+        self.v6_starts = []
+        self.v6_ends = []
+        self.v6_values = []
+        self.values = []
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'GeoIPIndex':
+        """Build from (start_int, end_int, is_v6, country, asn, as_org) rows"""
+        index = cls()
+        interned = {}
+        v4, v6 = [], []
+        for start, end, is_v6, country, asn, as_org in rows:
+            info = (country or None, asn or None, as_org or None)
+            slot = interned.get(info)
+            if slot is None:
+                slot = interned[info] = len(index.values)
+                index.values.append(info)
+            (v6 if is_v6 else v4).append((start, end, slot))
+        v4.sort()
+        v6.sort()
+        for start, end, slot in v4:
+            index.v4_starts.append(start)
+            index.v4_ends.append(end)
+            index.v4_values.append(slot)
+        for start, end, slot in v6:
+            index.v6_starts.append(start)
+            index.v6_ends.append(end)
+            index.v6_values.append(slot)
+        return index
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'GeoIPIndex':
+        def rows():
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if not row or row[0].startswith('#') or row[0] == 'start_ip':
+                        continue
+                    start, end = _to_int(row[0]), _to_int(row[1])
+                    is_v6 = ':' in row[0] or start > 0xFFFFFFFF
+                    asn = int(row[3]) if len(row) > 3 and row[3].strip().isdigit() else None
+                    yield (start, end, is_v6, row[2].strip() if len(row) > 2 else None,
+                           asn, row[4].strip() if len(row) > 4 else None)
+        return cls.from_rows(rows())
+
+    def __len__(self) -> int:
+        return len(self.v4_starts) + len(self.v6_starts)
+
+    def lookup_int(self, ip: int, is_v6: bool) -> Optional[tuple]:
+        starts, ends, values = (
+            (self.v6_starts, self.v6_ends, self.v6_values) if is_v6
+            else (self.v4_starts, self.v4_ends, self.v4_values)
+        )
+        i = bisect_right(starts, ip) - 1
+        if i >= 0 and ip <= ends[i]:
+            return self.values[values[i]]
+        return None
+
+
+class _MMDBIndex:
+    def __init__(self, path: str):
+        self.reader = maxminddb.open_database(path)
+
+    def __len__(self) -> int:
+        return self.reader.metadata().node_count
+
+    def lookup(self, ip: str) -> Optional[tuple]:
+        record = self.reader.get(ip)
+        if not record:
+            return None
+        country = (record.get('country') or {}).get('iso_code')
+        return country, record.get('autonomous_system_number'), record.get('autonomous_system_organization')
+
+
+class GeoIPEnricher:
+    """Hot-swappable GeoIP database with an LRU cache in front of it"""
+
+    def __init__(self, path: str = GEOIP_DB_PATH):
+        self.path = path
+        self._index = None
+        self._lock = threading.Lock()
+        self._cached_lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def load(self, path: Optional[str] = None):
+        """
+        (Re)load the database; lookups keep using the old index until it's swapped.
+
+        Returns:
+            The loaded index, or None if no usable database was found
+        """
+        path = path or self.path
+        if not os.path.exists(path):
+            logger.info(f"GeoIP database not found at {path}, geolocation enrichment disabled")
+            index = None
+        elif path.endswith('.mmdb'):
+            if maxminddb is None:
+                logger.warning("maxminddb not installed, cannot read .mmdb GeoIP database")
+                index = None
+            else:
+                index = _MMDBIndex(path)
+        else:
+            index = GeoIPIndex.from_csv(path)
+            logger.info(f"✅ GeoIP database loaded: {len(index)} ranges from {path}")
+        with self._lock:
+            self.path = path
+            self._index = index
+            self._cached_lookup.cache_clear()
+        return index
+
+    def _lookup(self, ip: str) -> Optional[dict]:
+        index = self._index
+        if index is None:
+            return None
+        try:
+            if isinstance(index, _MMDBIndex):
+                info = index.lookup(ip)
+            else:
+                addr = ipaddress.ip_address(ip)
+                info = index.lookup_int(int(addr), addr.version == 6)
+        except ValueError:
+            return None
+        if info is None:
+            return None
+        country, asn, as_org = info
+        return {'country': country, 'asn': asn, 'as_org': as_org}
+
+    def lookup(self, ip: str) -> Optional[dict]:
+        """Cached lookup; returns None until load() has run"""
+        return self._cached_lookup(ip)
+
+    def enrich(self, event: dict) -> dict:
+        """Fill event['geolocation'] in place if it is empty"""
+        if not event.get('geolocation') and event.get('source_ip'):
+            geo = self.lookup(event['source_ip'])
+            if geo is not None:
+                event['geolocation'] = dict(geo)
+        return event
+
+    def cache_info(self):
+        return self._cached_lookup.cache_info()
+
+
+geoip = GeoIPEnricher()
@@ -0,0 +1,135 @@
+"""
+Connection Governor for HoneyCloud-X honeypots
+Shared per-source_ip tarpit: tracks request rates in a compact sliding-window
+table and slows aggressive sources down with escalating response delays and
+per-IP connection caps.
+
+Delays are asyncio timers (call_later), so a held connection costs a
+timer handle, not a thread.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, Optional
+
+from ..metrics import registry
+from ..rate_limit import SlidingWindowLimiter
+
+logger = logging.getLogger(__name__)
+
+# Requests per window a source may make before it gets tarpitted
+RATE_LIMIT = 30
+RATE_WINDOW = 60.0
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+MAX_CONNECTIONS_PER_IP = 5
+MAX_HELD_RESPONSES = 10000
+
+tarpit_held = registry.gauge(
+    'honeycloud_tarpit_held_responses', 'Honeypot responses currently held by the tarpit', ('service',))
+tarpit_delayed = registry.counter(
+    'honeycloud_tarpit_delayed_total', 'Honeypot responses delayed by the tarpit', ('service',))
+tarpit_delay_seconds = registry.counter(
+    'honeycloud_tarpit_delay_seconds_total', 'Total delay imposed on attackers', ('service',))
+tarpit_requests_avoided = registry.counter(
+    'honeycloud_tarpit_requests_avoided_total',
+    'Estimated requests attackers could not send while held (delay x their measured rate)', ('service',))
+tarpit_rejected = registry.counter(
+    'honeycloud_tarpit_rejected_connections_total', 'Connections refused by the per-IP cap', ('service',))
+
+
+class ConnectionGovernor:
+    """Per-source rate tracking, escalating delays and connection caps"""
+
+    def __init__(self, rate_limit: int = RATE_LIMIT, window: float = RATE_WINDOW,
+                 base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 max_connections_per_ip: int = MAX_CONNECTIONS_PER_IP,
+                 max_held: int = MAX_HELD_RESPONSES):
+        self.rates = SlidingWindowLimiter(limit=rate_limit, window=window)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_connections_per_ip = max_connections_per_ip
+        self.max_held = max_held
+        self._connections: Dict[str, int] = {}
+        self._held = 0
+
+    # -- connection caps --------------------------------------------------
+
+    def admit(self, source_ip: str, service: str = 'unknown') -> bool:
+        """Register a new connection; False if the source is over its cap"""
+        count = self._connections.get(source_ip, 0)
+        if count >= self.max_connections_per_ip:
+            tarpit_rejected.inc(service=service)
+            return False
+        self._connections[source_ip] = count + 1
+        return True
+
+    def release(self, source_ip: str):
+        count = self._connections.get(source_ip, 0) - 1
+        if count > 0:
+            self._connections[source_ip] = count
+        else:
+            self._connections.pop(source_ip, None)
+
+    # -- response delays --------------------------------------------------
+
+    def delay_for(self, source_ip: str, service: str = 'unknown') -> float:
+        """Record a request and return how long its response should be held"""
+        rate = self.rates.hit(source_ip)
+        excess = rate - self.rates.limit
+        if excess <= 0:
+            return 0.0
+        # Doubles for every further `limit` requests over the threshold
+        delay = min(self.max_delay, self.base_delay * 2 ** (excess / self.rates.limit))
+        if self._held >= self.max_held:
+            # Tarpit full: hold nothing more rather than grow without bound
+            return 0.0
+        tarpit_delayed.inc(service=service)
+        tarpit_delay_seconds.inc(delay, service=service)
+        tarpit_requests_avoided.inc(delay * rate / self.rates.window, service=service)
+        return delay
+
+    def _hold(self, service: str):
+        self._held += 1
+        tarpit_held.inc(service=service)
+
+    def _unhold(self, service: str):
+        self._held -= 1
+        tarpit_held.dec(service=service)
+
+    def call_later(self, source_ip: str, callback: Callable, *args,
+                   service: str = 'unknown') -> Optional[Callable]:
+        """
+        Run a (synchronous) response callback after the tarpit delay.
+
+        Returns:
+            A cancel function for use when the connection drops first,
+            or None if the callback ran immediately
+        """
+        delay = self.delay_for(source_ip, service)
+        if delay <= 0:
+            callback(*args)
+            return None
+
+        pending = [True]
+
+        def fire():
+            pending[0] = False
+            self._unhold(service)
+            callback(*args)
+
+        def cancel():
+            if pending[0]:
+                pending[0] = False
+                handle.cancel()
+                self._unhold(service)
+
+        self._hold(service)
+        handle = asyncio.get_event_loop().call_later(delay, fire)
+        return cancel
+
+    @property
+    def held(self) -> int:
+        return self._held
+
+
+governor = ConnectionGovernor()
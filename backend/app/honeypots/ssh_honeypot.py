@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import logging
 from twisted.conch import avatar, recvline
 from twisted.conch.ssh import factory, keys, session
@@ -6,15 +7,27 @@ from twisted.cred import portal
 from twisted.python import log
 from datetime import datetime
 
+from .governor import governor
+from ..sessions import attack_sessions
+
 logger = logging.getLogger(__name__)
 
 class SSHProtocol(recvline.HistoricRecvLine):
     def __init__(self, user, attack_callback):
         self.user = user
         self.attack_callback = attack_callback
+        self.admitted = False
+        # response id -> cancel function, for responses held by the tarpit
+        self.pending_responses = {}
+        self._response_ids = itertools.count()
         
     def connectionMade(self):
         recvline.HistoricRecvLine.connectionMade(self)
+        peer_ip = self.transport.getPeer().host
+        if not governor.admit(peer_ip, service='ssh'):
+            self.transport.loseConnection()
+            return
+        self.admitted = True
         self.terminal.write(b"Welcome to Ubuntu 20.04 LTS\n")
         self.terminal.write(b"$ ")
         
@@ -22,31 +35,41 @@ class SSHProtocol(recvline.HistoricRecvLine):
         line_str = line.decode('utf-8', errors='ignore')
         logger.info(f"SSH command received: {line_str}")
         
-        # Log attack
+        # Log attack (severity and labels are assigned by the detection pipeline)
         attack_data = {
             'service': 'ssh',
             'source_ip': self.transport.getPeer().host,
             'source_port': self.transport.getPeer().port,
             'username': self.user.username,
             'command': line_str,
-            'severity': self._calculate_severity(line_str),
             'timestamp': datetime.now()
         }
         
         asyncio.create_task(self.attack_callback(attack_data))
         
-        # Fake response
+        # Fake response, held back by the tarpit for aggressive sources
+        response_id = next(self._response_ids)
+        cancel = governor.call_later(
+            attack_data['source_ip'], self._respond, response_id, line, service='ssh'
+        )
+        if cancel is not None:
+            self.pending_responses[response_id] = cancel
+
+    def _respond(self, response_id: int, line: bytes):
+        self.pending_responses.pop(response_id, None)
         self.terminal.write(b"bash: " + line + b": command not found\n")
         self.terminal.write(b"$ ")
-    
-    def _calculate_severity(self, command: str) -> str:
-        dangerous_keywords = ['rm', 'wget', 'curl', 'nc', 'bash', 'python', '/etc/passwd']
-        if any(kw in command.lower() for kw in dangerous_keywords):
-            return "CRITICAL"
-        elif len(command) > 50:
-            return "HIGH"
-        else:
-            return "MEDIUM"
+
+    def connectionLost(self, reason):
+        recvline.HistoricRecvLine.connectionLost(self, reason)
+        for cancel in self.pending_responses.values():
+            cancel()
+        self.pending_responses.clear()
+        peer = self.transport.getPeer()
+        if self.admitted:
+            governor.release(peer.host)
+            # Not an attack event: only the sessionizer needs to know
+            attack_sessions.close(peer.host, peer.port)
 
 class SSHAvatar(avatar.ConchUser):
     def __init__(self, username, attack_callback):
@@ -0,0 +1,222 @@
+"""
+Bulk Ingestion for HoneyCloud-X
+Parses NDJSON / JSON / msgpack batches from remote sensors, validates them
+in bulk against AttackEventCreate, and holds the rule and scoring steps the
+detection pipeline runs on every event regardless of where it came from.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from .blob_store import blob_store
+from .schemas import AttackEventCreate
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_EVENTS = 10000
+# Request body limit for /api/ingest, enforced while the body is read
+MAX_INGEST_BYTES = 32 * 1024 * 1024
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonlines')
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+_batch_adapter = TypeAdapter(List[AttackEventCreate])
+
+DANGEROUS_KEYWORDS = ('rm', 'wget', 'curl', 'nc', 'bash', 'python', '/etc/passwd')
+SEVERITIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+
+# Attacker-controlled text moved into the content-addressed blob store
+CONTENT_FIELDS = ('command', 'payload')
+# Payloads longer than this are only kept by hash on the event
+INLINE_PAYLOAD_LIMIT = 256
+
+# Label/score used when no ML engine is available
+RULE_SCORES = {
+    'LOW': ('benign', 0.1),
+    'MEDIUM': ('anomaly', 0.4),
+    'HIGH': ('malicious', 0.7),
+    'CRITICAL': ('malicious', 0.9),
+}
+
+
+class BatchFormatError(ValueError):
+    """Raised when a batch body cannot be decoded"""
+
+
+def parse_batch(body: bytes, content_type: str) -> list:
+    """
+    Decode a request body into a list of raw event dicts.
+
+    Args:
+        body: Raw request body
+        content_type: Request Content-Type header
+
+    Returns:
+        List of raw (unvalidated) event objects
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+
+    if content_type in MSGPACK_TYPES:
+        if msgpack is None:
+            raise BatchFormatError("msgpack support not installed")
+        try:
+            records = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise BatchFormatError(f"Invalid msgpack body: {e}")
+    elif content_type in NDJSON_TYPES:
+        records = []
+        for lineno, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                raise BatchFormatError(f"Invalid JSON on line {lineno}: {e}")
+    else:
+        try:
+            records = json.loads(body)
+        except ValueError as e:
+            raise BatchFormatError(f"Invalid JSON body: {e}")
+
+    if isinstance(records, dict):
+        records = records.get('events', [records])
+    if not isinstance(records, list):
+        raise BatchFormatError("Batch must be a list of events")
+    if len(records) > MAX_BATCH_EVENTS:
+        raise BatchFormatError(f"Batch too large ({len(records)} > {MAX_BATCH_EVENTS} events)")
+    return records
+
+
+def validate_batch(records: list) -> Tuple[List[Tuple[int, AttackEventCreate]], List[dict]]:
+    """
+    Validate a whole batch in one call. If any record fails, the failures
+    are collected from that call's errors and the remaining records are
+    validated again in a second bulk call.
+
+    Returns:
+        (accepted [(index, event)], rejected [{'index', 'error'}])
+    """
+    try:
+        return list(enumerate(_batch_adapter.validate_python(records))), []
+    except ValidationError as e:
+        bad = {}
+        for err in e.errors():
+            index = err['loc'][0] if err['loc'] else None
+            if isinstance(index, int) and index not in bad:
+                field = '.'.join(str(p) for p in err['loc'][1:]) or 'event'
+                bad[index] = f"{field}: {err['msg']}"
+
+    indexes = [index for index in range(len(records)) if index not in bad]
+    events = _batch_adapter.validate_python([records[index] for index in indexes])
+    rejected = [{'index': index, 'error': message} for index, message in sorted(bad.items())]
+    return list(zip(indexes, events)), rejected
+
+
+def prepare_batch(body: bytes, content_type: str,
+                  received_at: Optional[datetime] = None) -> Tuple[int, List[dict], List[dict]]:
+    """
+    Parse and validate a sensor batch into event dicts.
+
+    Returns:
+        (records received, accepted event dicts, rejected [{'index', 'error'}])
+    """
+    records = parse_batch(body, content_type)
+    accepted, rejected = validate_batch(records)
+    received_at = received_at or datetime.now()
+    return len(records), [to_event_dict(event, received_at) for _, event in accepted], rejected
+
+
+class IngestJob:
+    """A raw sensor batch queued at the pipeline's ingest stage; `future` gets the ack"""
+
+    __slots__ = ('body', 'content_type', 'future')
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.future = asyncio.get_running_loop().create_future()
+
+
+def classify_content(data: bytes) -> str:
+    """Rule-based severity of a command or payload blob"""
+    text = data.decode('utf-8', errors='ignore').lower()
+    if any(kw in text for kw in DANGEROUS_KEYWORDS):
+        return "CRITICAL"
+    elif len(text) > 50:
+        return "HIGH"
+    else:
+        return "MEDIUM"
+
+
+def intern_content(event: dict) -> str:
+    """
+    Store command/payload in the blob store, reference them by hash and
+    return the worst cached verdict (each distinct blob is classified once).
+    """
+    severity = "MEDIUM"
+    for field in CONTENT_FIELDS:
+        text = event.get(field)
+        if not text:
+            continue
+        if field == 'payload' and len(text) > INLINE_PAYLOAD_LIMIT:
+            digest, verdict = blob_store.intern(text, classify_content)
+            del event['payload']
+        else:
+            # Commands and short payloads stay on the event for display and
+            # alerts; only their verdict is cached
+            digest, verdict = blob_store.verdict(text, classify_content)
+        event[f'{field}_hash'] = digest
+        if SEVERITIES.index(verdict) > SEVERITIES.index(severity):
+            severity = verdict
+    return severity
+
+
+def normalize_event(event: dict, received_at: Optional[datetime] = None) -> dict:
+    """Bring an event dict from any source (sensor batch, honeypot, simulator) into the stored shape"""
+    event['service'] = (event.get('service') or 'unknown').upper()
+    timestamp = event.get('timestamp') or received_at or datetime.now()
+    event['timestamp'] = timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+    return event
+
+
+def to_event_dict(event: AttackEventCreate, received_at: Optional[datetime] = None) -> dict:
+    """Convert a validated event into the in-memory event dict shape"""
+    return normalize_event(event.model_dump(exclude_none=True), received_at)
+
+
+def apply_rules(event: dict) -> dict:
+    """
+    Rule-based severity: keep a valid severity reported by the sensor,
+    otherwise use the worst verdict of the event's command/payload.
+    """
+    content_severity = intern_content(event)
+    severity = (event.get('severity') or '').upper()
+    event['severity'] = severity if severity in SEVERITIES else content_severity
+    return event
+
+
+def score_events(events: List[dict], detector=None):
+    """
+    Attach ai_label / threat_score to a batch in place, using one vectorised
+    ML call for the whole batch when a detector is available.
+    """
+    if detector is not None:
+        predictions = detector.predict_batch(events)
+    else:
+        predictions = [None] * len(events)
+
+    for event, prediction in zip(events, predictions):
+        if prediction is None:
+            label, score = RULE_SCORES[event['severity']]
+            prediction = {'label': label, 'score': score}
+        event['ai_label'] = prediction['label']
+        event['threat_score'] = prediction['score']
@@ -0,0 +1,56 @@
+"""
+Lazy Imports for HoneyCloud-X
+Defers heavy backends (openpyxl, requests, sklearn/numpy) until first use
+so the API process starts listening quickly.
+"""
+import importlib
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_import(module: str, name: str, fallback: Optional[Callable] = None) -> Callable:
+    """
+    Return a proxy for `module.name` that imports it on first call.
+
+    Args:
+        module: Module path, relative to the app package if it starts with '.'
+        name: Attribute to load from the module
+        fallback: Callable used if the import fails (missing optional deps);
+                  without one the ImportError is remembered and re-raised
+
+    Returns:
+        Callable with the same signature as the target
+    """
+    resolved = {}
+    lock = threading.Lock()
+
+    def load() -> Callable:
+        target = resolved.get('target')
+        if target is None:
+            with lock:
+                target = resolved.get('target')
+                if target is None:
+                    if 'error' in resolved:
+                        # Failed before: don't retry the import on every call
+                        raise ImportError(resolved['error'])
+                    try:
+                        target = getattr(importlib.import_module(module, __package__), name)
+                    except ImportError as e:
+                        if fallback is None:
+                            resolved['error'] = str(e)
+                            raise
+                        logger.warning(f"Module {module} not available: {e}")
+                        target = fallback
+                    resolved['target'] = target
+        return target
+
+    def proxy(*args, **kwargs):
+        return load()(*args, **kwargs)
+
+    proxy.load = load
+    proxy.__name__ = name
+    proxy.__doc__ = f"Lazily imported {module}.{name}"
+    return proxy
@@ -1,42 +1,72 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sse_starlette.sse import EventSourceResponse
 import asyncio
-import json
+import itertools
 import random
 import os
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
 
+from .lazy import lazy_import
+
+# Heavy backends (requests, openpyxl, sklearn/numpy) load on first use
+handle_attack_event = lazy_import(".alert_system", "handle_attack_event", lambda event: None)
+send_telegram_document = lazy_import(".alert_system", "send_telegram_document", lambda path, caption="": None)
+generate_csv_report = lazy_import(".report_generator", "generate_csv_report", lambda events, filename=None: "report.csv")
+generate_pdf_report = lazy_import(".report_generator", "generate_pdf_report", lambda events, stats, filename=None: "report.txt")
+generate_excel_report = lazy_import(".excel_export", "generate_excel_report", lambda events, stats, filename=None: "report.xlsx")
+generate_ndjson_report = lazy_import(".report_generator", "generate_ndjson_report", lambda lines, filename=None: "report.ndjson")
+MLThreatDetector = lazy_import(".ml_engine", "MLThreatDetector")
+
 # Import our custom modules
 try:
-    from .alert_system import handle_attack_event, send_telegram_document
-    from .report_generator import generate_csv_report, generate_pdf_report
-    from .excel_export import generate_excel_report
     from .auth import (
-        authenticate_user, 
+        authenticate_user_async,
+        login_rate_limited,
+        record_failed_login,
+        LOGIN_WINDOW_SECONDS,
         create_access_token, 
         get_current_user, 
         get_admin_user,
+        oauth2_scheme,
+        revoke_token,
         ACCESS_TOKEN_EXPIRE_MINUTES
     )
 except ImportError as e:
     logger = logging.getLogger(__name__)
     logger.warning(f"Some modules not available: {e}")
-    def handle_attack_event(event): pass
-    def send_telegram_document(path, caption): pass
-    def generate_csv_report(events, filename=None): return "report.csv"
-    def generate_pdf_report(events, stats, filename=None): return "report.txt"
-    def generate_excel_report(events, stats, filename=None): return "report.xlsx"
-    def authenticate_user(username, password): return None
+    async def authenticate_user_async(username, password): return None
+    def login_rate_limited(client_ip, username): return False
+    def record_failed_login(client_ip, username): pass
+    LOGIN_WINDOW_SECONDS = 900
     def create_access_token(data, expires_delta=None): return "token"
     def get_current_user(token): return None
     def get_admin_user(current_user): return None
+    def oauth2_scheme(): return None
+    def revoke_token(token): pass
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+from .sketches import attack_sketches, TRACKED_FIELDS
+from . import metrics
+from .event_log import EventLogWriter
+from .blob_store import blob_store
+from .geoip import geoip
+from .reputation import reputation
+from .sessions import attack_sessions, score_sessions
+from .schemas import SAMPLE_SENSOR_ID
+from .ingest import MAX_INGEST_BYTES, BatchFormatError, IngestJob, prepare_batch, normalize_event, apply_rules, score_events
+from .broadcast import broadcaster
+from .pipeline import Pipeline
+from .response_cache import response_cache
+from .serialization import FastJSONResponse, dumps, join_array
+from .cluster import CLUSTER_ROLE, NODE_ID, MAX_WIRE_BYTES, Aggregator, ClusterError, Forwarder, HttpTransport
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -46,6 +76,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Per-route latency metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -57,45 +90,310 @@ app.add_middleware(
 
 # In-memory storage for demo
 attack_events = []
+# Event id -> JSON bytes, serialized once when the event is stored
+attack_event_json = {}
+# Running totals for /api/stats, updated per event instead of re-scanning
+event_counts = {'service': {}, 'severity': {}, 'ai_label': {}}
+event_ids = itertools.count(1)
+SESSION_SWEEP_SECONDS = 5
+REPUTATION_RELOAD_SECONDS = 30
+BLOB_REFS_FLUSH_SECONDS = 30
+SIMULATION_INTERVAL_SECONDS = 10
+MAX_EVENTS_LIMIT = 10000
+SIMULATE_ATTACKS = os.getenv("HONEYCLOUD_SIMULATE", "1") != "0"
+# Telegram alerts and report delivery (set to 0 for benchmarks and tests)
+ALERTS_ENABLED = os.getenv("HONEYCLOUD_ALERTS", "1") != "0"
 
 # Ensure reports directory exists
 os.makedirs("reports", exist_ok=True)
 
+# Startup progress: "listening" once the app accepts requests, "ready" once warm
+startup_state = {
+    "started_at": time.time(),
+    "listening_at": None,
+    "ready_at": None,
+    "warmup": {},
+}
+_background_tasks = set()
+_ml_detector = None
+ML_UNAVAILABLE = object()
+event_log: Optional[EventLogWriter] = None
+# Cluster mode: set on sensor nodes (HONEYCLOUD_ROLE=sensor)
+forwarder: Optional[Forwarder] = None
+
+
+def spawn_background(coro):
+    """Run a coroutine in the background, keeping a reference until it finishes"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def get_ml_detector():
+    """Shared MLThreatDetector, created on first use (None if sklearn is missing)"""
+    global _ml_detector
+    if _ml_detector is None:
+        try:
+            _ml_detector = MLThreatDetector()
+        except ImportError as e:
+            # Remembered, so the ML stage and session sweeps don't retry the import
+            logger.warning(f"ML engine not available, using rule scores: {e}")
+            _ml_detector = ML_UNAVAILABLE
+    return None if _ml_detector is ML_UNAVAILABLE else _ml_detector
+
+
+async def warm_up():
+    """Load sample data and heavy backends without delaying the first request"""
+    submitted = await generate_sample_data()
+    startup_state["warmup"]["sample_data"] = "ok"
+    logger.info(f"✅ Generated {submitted} sample attack events")
+
+    for name, loader in (
+        ("geoip", geoip.load),
+        ("reputation", lambda: reputation.reload(force=True)),
+        ("alerts", handle_attack_event.load),
+        ("reports", generate_csv_report.load),
+        ("ml_engine", get_ml_detector),
+    ):
+        try:
+            loaded = await asyncio.to_thread(loader)
+            startup_state["warmup"][name] = "ok" if loaded is not None else "unavailable"
+        except Exception as e:
+            logger.warning(f"Warm-up of {name} failed: {e}")
+            startup_state["warmup"][name] = "unavailable"
+
+    startup_state["ready_at"] = time.time()
+    logger.info(f"✅ Warm-up finished in {startup_state['ready_at'] - startup_state['started_at']:.2f}s")
+
+    # Test alerts for critical events on startup
+    critical_events = [e for e in attack_events if e['severity'] == 'CRITICAL'][:2]
+    pipeline.offer(critical_events, stage='alert')
+
+
+async def sweep_sessions():
+    """Periodically close idle sessions and score completed ones as a batch"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        completed = attack_sessions.expire()
+        if completed:
+            scored = await asyncio.to_thread(score_sessions, completed, get_ml_detector())
+            attack_sessions.publish(scored)
+
+
+async def simulate_attacks():
+    """Demo traffic: occasionally push a random attack through the pipeline"""
+    while True:
+        await asyncio.sleep(SIMULATION_INTERVAL_SECONDS)
+        if random.random() > 0.6:
+            await pipeline.submit([{
+                'service': random.choice(['SSH', 'FTP', 'HTTP']),
+                'source_ip': f"{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}",
+                'source_port': random.randint(1024, 65535),
+                'username': random.choice(['admin', 'root', 'hacker']),
+                'command': random.choice(['ls', 'uname -a', 'cat /etc/passwd', 'wget malware.sh']),
+                'sensor_id': 'simulator',
+            }])
+
+
+async def watch_reputation_lists():
+    """Hot-reload reputation lists when files in the list directory change"""
+    while True:
+        await asyncio.sleep(REPUTATION_RELOAD_SECONDS)
+        try:
+            await asyncio.to_thread(reputation.reload)
+        except Exception as e:
+            logger.error(f"Reputation reload failed: {e}")
+
+
+async def flush_blob_refs():
+    """Periodically save blob refcounts and verdicts so a crash loses little"""
+    while True:
+        await asyncio.sleep(BLOB_REFS_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(blob_store.flush)
+        except OSError as e:
+            logger.error(f"Blob refcount flush failed: {e}")
+
 
 @app.on_event("startup")
 async def startup_event():
-    """Generate sample attack data on startup"""
+    """Start listening immediately; sample data and backends load in the background"""
+    global event_log, forwarder
     logger.info("🚀 Starting HoneyCloud-X API...")
-    generate_sample_data()
-    logger.info(f"✅ Generated {len(attack_events)} sample attack events")
-    
-    # Test alerts for critical events on startup
-    critical_events = [e for e in attack_events if e['severity'] == 'CRITICAL'][:2]
-    for event in critical_events:
+    # Resuming numbering scans the newest segment: keep it off the event loop
+    event_log = await asyncio.to_thread(EventLogWriter)
+    pipeline.start()
+    startup_state["listening_at"] = time.time()
+    spawn_background(warm_up())
+    spawn_background(sweep_sessions())
+    if SIMULATE_ATTACKS:
+        spawn_background(simulate_attacks())
+    spawn_background(watch_reputation_lists())
+    spawn_background(flush_blob_refs())
+    if CLUSTER_ROLE == "sensor":
+        forwarder = Forwarder(NODE_ID, HttpTransport())
+        spawn_background(forwarder.run())
+    logger.info(f"Cluster role: {CLUSTER_ROLE} (node {NODE_ID})")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain and stop the pipeline, then flush and close the event log and blob store refcounts"""
+    await pipeline.stop()
+    if forwarder is not None:
+        # Best effort: ship what is buffered; anything unsent is lost with the process
+        while forwarder.has_pending() and await forwarder.flush():
+            pass
+    if event_log is not None:
+        await asyncio.to_thread(event_log.close)
+    await asyncio.to_thread(blob_store.flush)
+
+
+def record_attack_event(event: dict, persist: bool = True):
+    """Store an attack event, append it to the event log and update the streaming sketches"""
+    if 'id' not in event:
+        event['id'] = next(event_ids)
+    # Bytes first: readers find an event's JSON as soon as the event is visible
+    attack_event_json[event['id']] = dumps(event)
+    attack_events.append(event)
+    for field, counts in event_counts.items():
+        value = event.get(field)
+        counts[value] = counts.get(value, 0) + 1
+    response_cache.bump()
+    if persist and event_log is not None:
+        event_log.append(event)
+    attack_sketches.add(event)
+    attack_sessions.add(event)
+    metrics.events_ingested.inc(service=metrics.bounded_label(event.get('service', 'unknown'), metrics.SERVICE_LABELS))
+
+
+# ========================
+# DETECTION PIPELINE
+# ingest -> enrich -> rules -> ml -> persist -> broadcast
+# persist also offers alert candidates to the side alert stage
+# ========================
+
+async def ingest_stage(items: list) -> list:
+    """Decode sensor batches (IngestJob) and normalise internal event dicts; assigns ids"""
+    events = []
+    received_at = datetime.now()
+    for item in items:
+        if isinstance(item, IngestJob):
+            try:
+                received, accepted, rejected = await asyncio.to_thread(
+                    prepare_batch, item.body, item.content_type, received_at
+                )
+            except Exception as e:
+                if not item.future.done():
+                    item.future.set_exception(e)
+                continue
+            for event in accepted:
+                event['id'] = next(event_ids)
+            if not item.future.done():
+                item.future.set_result((received, accepted, rejected))
+            events.extend(accepted)
+        else:
+            event = normalize_event(item, received_at)
+            event['id'] = next(event_ids)
+            events.append(event)
+    return events
+
+
+def enrich_stage(events: list) -> list:
+    """GeoIP/ASN lookup and reputation list tags"""
+    for event in events:
+        geoip.enrich(event)
+        reputation.tag(event)
+    return events
+
+
+def rules_stage(events: list) -> list:
+    """Rule-based severity from sensor input, command/payload content and reputation"""
+    for event in events:
+        apply_rules(event)
+        reputation.raise_severity(event)
+    return events
+
+
+def ml_stage(events: list) -> list:
+    """One vectorised ML call per batch (rule scores if the engine is unavailable)"""
+    score_events(events, get_ml_detector())
+    for event in events:
+        reputation.raise_score(event)
+    return events
+
+
+def is_sample(event: dict) -> bool:
+    """Demo history from this node (forwarded events, with node_id, never are)"""
+    return event.get('sensor_id') == SAMPLE_SENSOR_ID and 'node_id' not in event
+
+
+def should_alert(event: dict) -> bool:
+    """CRITICAL or malicious, from this node's own sensors"""
+    # Forwarded events (node_id set) were already alerted on by their sensor
+    if not ALERTS_ENABLED or is_sample(event) or 'node_id' in event:
+        return False
+    return event.get('severity') == 'CRITICAL' or event.get('ai_label') == 'malicious'
+
+
+def persist_stage(events: list) -> list:
+    for event in events:
+        record_attack_event(event, persist=not is_sample(event))
+    # Fire and forget: a full alert queue drops alerts instead of stalling the chain
+    dropped = pipeline.offer([e for e in events if should_alert(e)], stage='alert')
+    if dropped:
+        logger.warning(f"⚠️ Alert queue full, dropped {dropped} alert(s)")
+    return events
+
+
+def alert_stage(events: list):
+    """Telegram alerts (blocking HTTP, so the stage is offloaded to threads)"""
+    for event in events:
         handle_attack_event(event)
 
 
-def generate_sample_data():
-    """Generate realistic attack data"""
-    services = ['SSH', 'FTP', 'HTTP']
-    severities = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
-    labels = ['benign', 'anomaly', 'malicious']
-    usernames = ['admin', 'root', 'user', 'test', 'administrator', 'guest']
-    
-    for i in range(100):
-        attack_events.append({
-            'id': i + 1,
-            'timestamp': (datetime.now() - timedelta(minutes=i*10)).isoformat(),
-            'service': random.choice(services),
-            'source_ip': f"{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}",
-            'source_port': random.randint(1024, 65535),
-            'username': random.choice(usernames),
-            'password': f"pass{random.randint(1000,9999)}",
-            'command': random.choice(['ls', 'pwd', 'cat /etc/passwd', 'wget malware.sh', 'curl evil.com']),
-            'severity': random.choice(severities),
-            'ai_label': random.choice(labels),
-            'threat_score': round(random.uniform(0, 1), 2)
-        })
+def broadcast_stage(events: list):
+    payloads = [attack_event_json[e['id']] for e in events]
+    # Decoded once per event, shared by every SSE client
+    broadcaster.publish([p.decode() for p in payloads])
+    if forwarder is not None:
+        forwarder.enqueue([p for e, p in zip(events, payloads) if not is_sample(e)])
+
+
+pipeline = Pipeline({
+    'ingest': ingest_stage,
+    'enrich': enrich_stage,
+    'rules': rules_stage,
+    'ml': ml_stage,
+    'persist': persist_stage,
+    'alert': alert_stage,
+    'broadcast': broadcast_stage,
+})
+
+
+# Aggregator nodes store forwarded events directly: sensors already ran detection
+aggregator = (
+    Aggregator(lambda events: pipeline.submit(events, stage='persist'))
+    if CLUSTER_ROLE == "aggregator" else None
+)
+
+
+async def submit_honeypot_event(event: dict):
+    """attack_callback for the honeypot servers"""
+    await pipeline.submit([event])
+
+
+async def generate_sample_data() -> int:
+    """Seeded synthetic attack history (classified by the pipeline like real traffic)"""
+    from .traffic import TrafficGenerator
+
+    generator = TrafficGenerator(seed=random.randrange(2 ** 32), sensor_id=SAMPLE_SENSOR_ID)
+    events = generator.take(100)
+    for i, event in enumerate(events):
+        event['timestamp'] = (datetime.now() - timedelta(minutes=i*10)).isoformat()
+    await pipeline.submit(events)
+    return len(events)
 
 
 # ========================
@@ -103,7 +401,7 @@ def generate_sample_data():
 # ========================
 
 @app.post("/auth/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Login endpoint - Returns JWT token
     
@@ -111,8 +409,18 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     - admin / admin123
     - analyst / analyst123
     """
-    user = authenticate_user(form_data.username, form_data.password)
+    client_ip = request.client.host if request.client else "unknown"
+    if login_rate_limited(client_ip, form_data.username):
+        logger.warning(f"⛔ Login rate limited: {form_data.username} from {client_ip}")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(LOGIN_WINDOW_SECONDS)}
+        )
+
+    user = await authenticate_user_async(form_data.username, form_data.password)
     if not user:
+        record_failed_login(client_ip, form_data.username)
         logger.warning(f"❌ Failed login attempt: {form_data.username}")
         raise HTTPException(
             status_code=401, 
@@ -135,6 +443,17 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     }
 
 
+@app.post("/auth/logout")
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: dict = Depends(get_current_user)
+):
+    """Revoke the current JWT token"""
+    revoke_token(token)
+    logger.info(f"👋 User logged out: {current_user['username']}")
+    return {"status": "logged_out"}
+
+
 @app.get("/api/protected")
 async def protected_route(current_user: dict = Depends(get_current_user)):
     """Protected endpoint - requires login"""
@@ -161,8 +480,20 @@ def root():
     }
 
 
+def _filter_events(limit: int, service: Optional[str], severity: Optional[str]) -> bytes:
+    filtered_events = attack_events
+    
+    if service:
+        filtered_events = [e for e in filtered_events if e['service'] == service]
+    if severity:
+        filtered_events = [e for e in filtered_events if e['severity'] == severity]
+    
+    return join_array(attack_event_json[e['id']] for e in filtered_events[:limit])
+
+
 @app.get("/api/events")
 def get_events(
+    request: Request,
     limit: int = 50, 
     service: Optional[str] = None, 
     severity: Optional[str] = None,
@@ -170,53 +501,92 @@ def get_events(
 ):
     """
     Get attack events with optional filters
+    Served from the response cache; supports If-None-Match (304)
     Requires authentication
     """
-    filtered_events = attack_events
-    
-    if service:
-        filtered_events = [e for e in filtered_events if e['service'] == service]
-    if severity:
-        filtered_events = [e for e in filtered_events if e['severity'] == severity]
-    
-    logger.info(f"User {current_user['username']} accessed events (limit: {limit})")
-    return filtered_events[:limit]
+    logger.debug(f"User {current_user['username']} accessed events (limit: {limit})")
+    # Normalised so every oversized limit shares one cache entry
+    limit = max(0, min(limit, MAX_EVENTS_LIMIT, len(attack_events)))
+    return response_cache.respond(
+        request, "events", (limit, service, severity),
+        lambda: _filter_events(limit, service, severity)
+    )
+
+
+def build_statistics() -> dict:
+    """Dashboard statistics from the running per-event totals"""
+    stats = {
+        'total_events': len(attack_events),
+        'events_by_service': dict(event_counts['service']),
+        'events_by_severity': dict(event_counts['severity']),
+        'ai_labels': dict(event_counts['ai_label']),
+        # Time of the last data change, so cached responses stay truthful
+        'last_updated': datetime.fromtimestamp(response_cache.updated_at).isoformat()
+    }
+    if aggregator is not None:
+        stats['events_by_node'] = {node_id: n.events for node_id, n in aggregator.nodes.items()}
+    return stats
 
 
 @app.get("/api/stats")
-def get_statistics(current_user: dict = Depends(get_current_user)):
+def get_statistics(request: Request, current_user: dict = Depends(get_current_user)):
     """
     Get dashboard statistics
+    Served from the response cache; supports If-None-Match (304)
     Requires authentication
     """
-    total_events = len(attack_events)
-    
-    # Events by service
-    service_counts = {}
-    for event in attack_events:
-        service = event['service']
-        service_counts[service] = service_counts.get(service, 0) + 1
-    
-    # Events by severity
-    severity_counts = {}
-    for event in attack_events:
-        severity = event['severity']
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
-    
-    # AI labels
-    label_counts = {}
-    for event in attack_events:
-        label = event['ai_label']
-        label_counts[label] = label_counts.get(label, 0) + 1
-    
-    logger.info(f"User {current_user['username']} accessed statistics")
-    
+    logger.debug(f"User {current_user['username']} accessed statistics")
+    return response_cache.respond(request, "stats", (), build_statistics)
+
+
+@app.get("/api/stats/top", response_class=FastJSONResponse)
+def get_top_values(
+    field: str = "source_ip",
+    k: int = 20,
+    window: int = 3600,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Top-K leaderboard for source_ip, username, password or command
+    Counts come from Space-Saving sketches and may overestimate by `error`
+    Requires authentication
+    """
+    if field not in TRACKED_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown field '{field}', expected one of: {', '.join(TRACKED_FIELDS)}"
+        )
+    return attack_sketches.top(field, k=max(1, min(k, 100)), window=window)
+
+
+@app.get("/api/stats/unique", response_class=FastJSONResponse)
+def get_unique_sources(
+    window: int = 3600,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Estimated number of distinct source IPs (HyperLogLog, ~1.6% error)
+    Requires authentication
+    """
+    return attack_sketches.unique(window=window)
+
+
+@app.get("/api/sessions", response_class=FastJSONResponse)
+def get_sessions(
+    limit: int = 50,
+    active: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Reconstructed attacker sessions grouped by (source_ip, source_port)
+    Completed sessions by default; active=true lists sessions still open
+    Requires authentication
+    """
+    limit = max(1, min(limit, 1000))
+    sessions = attack_sessions.active(limit) if active else attack_sessions.recent(limit)
     return {
-        'total_events': total_events,
-        'events_by_service': service_counts,
-        'events_by_severity': severity_counts,
-        'ai_labels': label_counts,
-        'last_updated': datetime.now().isoformat()
+        "active_sessions": len(attack_sessions),
+        "sessions": sessions
     }
 
 
@@ -227,37 +597,183 @@ async def event_stream(current_user: dict = Depends(get_current_user)):
     Requires authentication
     """
     async def event_generator():
-        last_id = len(attack_events)
-        while True:
-            # Simulate new attack every 10 seconds
-            if random.random() > 0.6:
-                new_event = {
-                    'id': last_id + 1,
-                    'timestamp': datetime.now().isoformat(),
-                    'service': random.choice(['SSH', 'FTP', 'HTTP']),
-                    'source_ip': f"{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}.{random.randint(1,255)}",
-                    'username': random.choice(['admin', 'root', 'hacker']),
-                    'severity': random.choice(['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']),
-                    'ai_label': random.choice(['benign', 'anomaly', 'malicious']),
-                    'threat_score': round(random.uniform(0, 1), 2)
-                }
-                attack_events.append(new_event)
-                
-                # Send alert if critical/malicious
-                handle_attack_event(new_event)
-                
+        queue = broadcaster.subscribe()
+        try:
+            while True:
                 yield {
                     "event": "new_attack",
-                    "data": json.dumps(new_event)
+                    "data": await queue.get()
                 }
-                last_id += 1
-            
-            await asyncio.sleep(10)
+        finally:
+            broadcaster.unsubscribe(queue)
     
     logger.info(f"User {current_user['username']} started event stream")
     return EventSourceResponse(event_generator())
 
 
+# ========================
+# SENSOR INGESTION
+# ========================
+
+async def read_capped_body(request: Request, limit: int) -> bytes:
+    """Request body, refused with 413 as soon as it exceeds `limit` bytes"""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Body exceeds {limit} bytes")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail=f"Body exceeds {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@app.post("/api/ingest")
+async def ingest_batch(request: Request, current_user: dict = Depends(get_admin_user)):
+    """
+    Bulk ingest endpoint for remote sensors
+    Accepts NDJSON (application/x-ndjson), msgpack (application/msgpack)
+    or a JSON array of AttackEventCreate records
+    Responds once the batch is validated and queued for detection
+    (waits while the pipeline is saturated)
+    Admin only endpoint; bodies over MAX_INGEST_BYTES get 413
+    """
+    body = await read_capped_body(request, MAX_INGEST_BYTES)
+    job = IngestJob(body, request.headers.get("content-type", ""))
+    await pipeline.submit([job])
+    try:
+        received, events, rejected = await job.future
+    except BatchFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batch_id = uuid.uuid4().hex
+    logger.info(
+        f"📥 Batch {batch_id[:8]} from {current_user['username']}: "
+        f"{len(events)} accepted, {len(rejected)} rejected"
+    )
+    return {
+        "batch_id": batch_id,
+        "received": received,
+        "accepted": len(events),
+        "rejected": len(rejected),
+        "errors": rejected[:100],
+        "first_id": events[0]['id'] if events else None,
+        "last_id": events[-1]['id'] if events else None,
+    }
+
+
+@app.get("/api/pipeline")
+def get_pipeline_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Per-stage queue depth, throughput, latency and utilization
+    of the detection pipeline
+    Requires authentication
+    """
+    stats = pipeline.stats()
+    stats["sse_subscribers"] = len(broadcaster)
+    stats["sse_dropped"] = broadcaster.dropped
+    return stats
+
+
+# ========================
+# CLUSTER MODE
+# ========================
+
+@app.post("/api/cluster/batches")
+async def receive_cluster_batch(request: Request, current_user: dict = Depends(get_admin_user)):
+    """
+    Compressed NDJSON event batch forwarded by a sensor node
+    Only available with HONEYCLOUD_ROLE=aggregator
+    Admin only endpoint (sensors log in with HONEYCLOUD_CLUSTER_USERNAME)
+    """
+    if aggregator is None:
+        raise HTTPException(status_code=404, detail="This node is not an aggregator")
+    node_id = request.headers.get("x-node-id")
+    if not node_id:
+        raise HTTPException(status_code=400, detail="Missing X-Node-Id header")
+    body = await read_capped_body(request, MAX_WIRE_BYTES)
+    try:
+        seq = int(request.headers.get("x-batch-seq", "0"))
+        return await aggregator.receive(
+            node_id, seq, body, request.headers.get("content-encoding", ""),
+            request.headers.get("x-node-epoch", "")
+        )
+    except (ClusterError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/cluster", response_class=FastJSONResponse)
+def get_cluster_status(current_user: dict = Depends(get_current_user)):
+    """
+    Cluster role of this node; per-node rollups merged into a cluster-wide
+    view on aggregators, forwarding progress on sensors
+    Requires authentication
+    """
+    status = {"role": CLUSTER_ROLE, "node_id": NODE_ID}
+    if aggregator is not None:
+        status["aggregate"] = aggregator.summary()
+    if forwarder is not None:
+        status["forwarder"] = forwarder.stats()
+    return status
+
+
+# ========================
+# PAYLOAD BLOB STORE
+# ========================
+
+@app.get("/api/blobs/stats")
+def get_blob_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Deduplication report for stored payloads and commands
+    Requires authentication
+    """
+    return blob_store.stats()
+
+
+@app.get("/api/blobs/{digest}")
+def download_blob(digest: str, current_user: dict = Depends(get_admin_user)):
+    """
+    Raw payload/command content by SHA-256 (may be live malware)
+    Admin only endpoint
+    """
+    data = blob_store.get(digest.lower())
+    if data is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    logger.info(f"Admin {current_user['username']} downloaded blob {digest[:12]}")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename={digest}.bin"}
+    )
+
+
+# ========================
+# IP REPUTATION
+# ========================
+
+@app.get("/api/reputation")
+def get_reputation(ip: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """
+    Loaded reputation lists, or the lists matching `ip`
+    Requires authentication
+    """
+    if ip:
+        return {"ip": ip, "lists": list(reputation.match(ip))}
+    return reputation.summary()
+
+
+@app.post("/api/reputation/reload")
+async def reload_reputation(current_user: dict = Depends(get_admin_user)):
+    """
+    Force a reload of the reputation list files
+    Admin only endpoint
+    """
+    await asyncio.to_thread(reputation.reload, True)
+    logger.info(f"Admin {current_user['username']} reloaded reputation lists")
+    return reputation.summary()
+
+
 # ========================
 # REPORT GENERATION (ADMIN ONLY)
 # ========================
@@ -269,28 +785,35 @@ def generate_report(
     current_user: dict = Depends(get_admin_user)
 ):
     """
-    Generate attack report in CSV, Excel, or PDF format
+    Generate attack report in CSV, Excel, PDF or NDJSON format
     Admin only endpoint
     
-    Formats: csv, xlsx, txt
+    Formats: csv, xlsx, txt, ndjson
     """
     try:
-        stats = get_statistics(current_user)
+        stats = build_statistics()
         
         logger.info(f"Admin {current_user['username']} generating {format} report")
         
-        if format.lower() == "xlsx":
-            filepath = generate_excel_report(attack_events, stats)
-            message = "Excel report generated successfully"
-        elif format.lower() == "csv":
-            filepath = generate_csv_report(attack_events)
-            message = "CSV report generated successfully"
-        else:
-            filepath = generate_pdf_report(attack_events, stats)
-            message = "Text report generated successfully"
+        with metrics.report_generation_seconds.time(
+                format=metrics.bounded_label(format.lower(), metrics.REPORT_FORMAT_LABELS)):
+            if format.lower() == "xlsx":
+                filepath = generate_excel_report(attack_events, stats)
+                message = "Excel report generated successfully"
+            elif format.lower() == "csv":
+                filepath = generate_csv_report(attack_events)
+                message = "CSV report generated successfully"
+            elif format.lower() == "ndjson":
+                filepath = generate_ndjson_report(list(attack_event_json.values()))
+                message = "NDJSON export generated successfully"
+            else:
+                filepath = generate_pdf_report(attack_events, stats)
+                message = "Text report generated successfully"
         
         # Optionally send to Telegram
-        if send_telegram:
+        if send_telegram and not ALERTS_ENABLED:
+            message += " (Telegram delivery disabled)"
+        elif send_telegram:
             send_telegram_document(filepath, caption=f"HoneyCloud-X {format.upper()} Report")
             message += " and sent to Telegram"
             logger.info(f"Report sent to Telegram by {current_user['username']}")
@@ -326,6 +849,8 @@ def download_report(file: str):
         media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     elif file.endswith('.csv'):
         media_type = 'text/csv'
+    elif file.endswith('.ndjson'):
+        media_type = 'application/x-ndjson'
     else:
         media_type = 'application/octet-stream'
     
@@ -375,6 +900,32 @@ def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        metrics.registry.expose(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: 503 while warm-up is still running, 200 once fully warm"""
+    ready = startup_state["ready_at"] is not None
+    body = {
+        "status": "ready" if ready else "warming_up",
+        "listening": startup_state["listening_at"] is not None,
+        "warmup": startup_state["warmup"],
+        "warmup_seconds": (
+            round(startup_state["ready_at"] - startup_state["started_at"], 3) if ready else None
+        ),
+    }
+    if not ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,265 @@
+"""
+Metrics for HoneyCloud-X
+Low-overhead counters, gauges and histograms exposed in Prometheus text format.
+
+Counters and histograms aggregate into per-thread shards, so the hot path is
+a dict update on thread-local state with no lock; shards are only summed
+when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: dict) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames: Tuple[str, ...], key: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class _Sharded:
+    """Base for metrics that keep one shard per writing thread"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot(self) -> List[dict]:
+        with self._shards_lock:
+            return [dict(s) for s in self._shards]
+
+
+class Counter(_Sharded):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = _label_key(self.labelnames, labels) if labels else ()
+        shard[key] = shard.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for shard in self._snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def expose(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+            for key, value in sorted(self.values().items())
+        ]
+
+
+class Histogram(_Sharded):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = _label_key(self.labelnames, labels) if labels else ()
+        state = shard.get(key)
+        if state is None:
+            # [bucket counts..., +Inf count, sum]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = state
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def expose(self) -> List[str]:
+        merged: Dict[Tuple[str, ...], list] = {}
+        for shard in self._snapshot():
+            for key, state in shard.items():
+                total = merged.setdefault(key, [0] * len(state))
+                for i, v in enumerate(list(state)):
+                    total[i] += v
+        lines = []
+        for key, state in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            cumulative += state[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {state[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Point-in-time value; writes are rare enough to share a single dict"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        self._values[_label_key(self.labelnames, labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def expose(self) -> List[str]:
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {value}'
+            for key, value in sorted(dict(self._values).items())
+        ]
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Label values outside these sets (attacker, sensor or client input) are
+# reported as OTHER_LABEL so they cannot create new series
+OTHER_LABEL = 'other'
+SERVICE_LABELS = frozenset(('ssh', 'ftp', 'http', 'telnet', 'smtp', 'rdp', 'unknown'))
+REPORT_FORMAT_LABELS = frozenset(('csv', 'xlsx', 'ndjson', 'pdf', 'txt'))
+HTTP_METHOD_LABELS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+def bounded_label(value, known: frozenset) -> str:
+    """`value` if it is in the known set, otherwise OTHER_LABEL"""
+    return value if value in known else OTHER_LABEL
+
+# ====================================
+# HONEYCLOUD-X METRICS
+# ====================================
+events_ingested = registry.counter(
+    'honeycloud_events_ingested_total', 'Attack events ingested', ('service',))
+ml_scoring_seconds = registry.histogram(
+    'honeycloud_ml_scoring_seconds', 'ML threat scoring latency')
+pipeline_queue_depth = registry.gauge(
+    'honeycloud_pipeline_queue_depth', 'Items waiting in a detection pipeline stage queue', ('stage',))
+pipeline_queue_wait_seconds = registry.histogram(
+    'honeycloud_pipeline_queue_wait_seconds', 'Time a batch spent queued before its stage picked it up', ('stage',))
+pipeline_stage_seconds = registry.histogram(
+    'honeycloud_pipeline_stage_seconds', 'Time a stage spent processing one batch', ('stage',))
+pipeline_items = registry.counter(
+    'honeycloud_pipeline_items_total', 'Items processed per detection pipeline stage', ('stage',))
+pipeline_dropped = registry.counter(
+    'honeycloud_pipeline_dropped_total', 'Items dropped because a side stage queue was full', ('stage',))
+sse_subscribers = registry.gauge(
+    'honeycloud_sse_subscribers', 'Connected SSE event stream clients')
+report_generation_seconds = registry.histogram(
+    'honeycloud_report_generation_seconds', 'Report generation time', ('format',),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+http_request_seconds = registry.histogram(
+    'honeycloud_http_request_seconds', 'HTTP request latency until response start',
+    ('method', 'route', 'status'))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency (by route template, not raw path)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                route = scope.get('route')
+                http_request_seconds.observe(
+                    time.perf_counter() - start,
+                    method=bounded_label(scope['method'], HTTP_METHOD_LABELS),
+                    route=getattr(route, 'path', 'unmatched'),
+                    status=status['code'],
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -16,6 +16,9 @@ class AttackEvent(Base):
     password = Column(String(255), nullable=True)
     payload = Column(Text, nullable=True)
     command = Column(String(500), nullable=True)
+    # SHA-256 references into the blob store (deduplicated content)
+    payload_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True, index=True)
+    command_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True, index=True)
     
     # Severity classification
     severity = Column(String(20), index=True)  # LOW, MEDIUM, HIGH, CRITICAL
@@ -30,3 +33,18 @@ class AttackEvent(Base):
     
     def __repr__(self):
         return f"<AttackEvent {self.id} - {self.service} from {self.source_ip}>"
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    
+    # Content-addressed payload/command storage
+    hash = Column(String(64), primary_key=True)
+    refcount = Column(Integer, default=1)
+    size = Column(Integer)
+    stored_size = Column(Integer)
+    codec = Column(String(8))  # raw, zlib, zstd
+    verdict = Column(String(20), nullable=True)  # cached severity classification
+    
+    def __repr__(self):
+        return f"<Blob {self.hash[:12]} refs={self.refcount}>"
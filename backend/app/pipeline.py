@@ -0,0 +1,259 @@
+"""
+Detection Pipeline for HoneyCloud-X
+Explicit asyncio pipeline: ingest -> enrich -> rules -> ml -> persist -> broadcast,
+with `alert` as a side stage fed from persist
+
+Every stage has its own bounded queue, worker count and batch size, read
+from the `pipeline` section of configs/config.yaml. A full queue makes the
+upstream stage (or the API handler submitting work) wait, which is the
+backpressure signal. Side stages (alert) are fed with offer() instead: a
+full queue drops the item, so a slow external service never stalls the
+chain. Per-stage counters and latencies show where the bottleneck is
+under load.
+
+Delivery: stop() drains every queue before cancelling the workers, bounded
+by HONEYCLOUD_PIPELINE_DRAIN_SECONDS. Work still queued after that, or lost
+in a crash, is gone - batches acknowledged by /api/ingest or the cluster
+endpoint are delivered at most once.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = os.getenv(
+    "HONEYCLOUD_CONFIG",
+    os.path.join(os.path.dirname(__file__), "..", "..", "configs", "config.yaml")
+)
+
+STAGE_NAMES = ('ingest', 'enrich', 'rules', 'ml', 'persist', 'alert', 'broadcast')
+# Not chained: fed with Pipeline.offer() and their output is discarded
+SIDE_STAGES = ('alert',)
+DRAIN_SECONDS = float(os.getenv("HONEYCLOUD_PIPELINE_DRAIN_SECONDS", "10"))
+
+DEFAULT_STAGE_CONFIG = {
+    'queue_size': 10000,
+    'concurrency': 1,
+    'batch_size': 100,
+    # Run synchronous handlers in a worker thread instead of on the event loop
+    'offload': False,
+}
+
+
+def load_pipeline_config(path: str = CONFIG_PATH) -> Dict[str, dict]:
+    """Per-stage settings from config.yaml, falling back to defaults"""
+    stages = {}
+    try:
+        import yaml
+        with open(path, encoding='utf-8') as f:
+            stages = ((yaml.safe_load(f) or {}).get('pipeline') or {}).get('stages') or {}
+    except FileNotFoundError:
+        logger.info(f"No config at {path}, using default pipeline settings")
+    except ImportError:
+        logger.warning("pyyaml not installed, using default pipeline settings")
+
+    config = {}
+    for name in STAGE_NAMES:
+        config[name] = {**DEFAULT_STAGE_CONFIG, **(stages.get(name) or {})}
+    return config
+
+
+class Stage:
+    """One pipeline stage: a bounded queue drained in batches by N workers"""
+
+    def __init__(self, name: str, handler: Callable, queue_size: int, concurrency: int,
+                 batch_size: int, offload: bool = False):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.batch_size = max(1, int(batch_size))
+        self.offload = offload
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=int(queue_size))
+        self.next: Optional['Stage'] = None
+        self._workers: List[asyncio.Task] = []
+        self._started_at = None
+
+        self.processed = 0
+        self.emitted = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.max_batch_seconds = 0.0
+        self.in_flight = 0
+        self.dropped = 0
+
+    async def put(self, item: Any):
+        # (enqueue time, item) so queue wait can be measured per batch
+        await self.queue.put((time.perf_counter(), item))
+        metrics.pipeline_queue_depth.set(self.queue.qsize(), stage=self.name)
+
+    def offer(self, item: Any) -> bool:
+        """Queue an item without waiting; drops it if the queue is full"""
+        try:
+            self.queue.put_nowait((time.perf_counter(), item))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.pipeline_dropped.inc(stage=self.name)
+            return False
+        metrics.pipeline_queue_depth.set(self.queue.qsize(), stage=self.name)
+        return True
+
+    def idle(self) -> bool:
+        return self.queue.empty() and self.in_flight == 0
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"pipeline-{self.name}-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _next_batch(self) -> list:
+        batch = [await self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        metrics.pipeline_queue_depth.set(self.queue.qsize(), stage=self.name)
+        return batch
+
+    async def _run_handler(self, items: list):
+        if asyncio.iscoroutinefunction(self.handler):
+            return await self.handler(items)
+        if self.offload:
+            return await asyncio.to_thread(self.handler, items)
+        return self.handler(items)
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            start = time.perf_counter()
+            oldest = batch[0][0]
+            items = [item for _, item in batch]
+            self.in_flight += len(items)
+            try:
+                outputs = await self._run_handler(items)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Pipeline stage {self.name} failed on a batch of {len(items)}: {e}")
+                outputs = None
+
+            elapsed = time.perf_counter() - start
+            self.processed += len(items)
+            self.batches += 1
+            self.busy_seconds += elapsed
+            self.wait_seconds += start - oldest
+            self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
+            metrics.pipeline_stage_seconds.observe(elapsed, stage=self.name)
+            metrics.pipeline_queue_wait_seconds.observe(start - oldest, stage=self.name)
+            metrics.pipeline_items.inc(len(items), stage=self.name)
+
+            try:
+                if outputs and self.next is not None:
+                    self.emitted += len(outputs)
+                    for output in outputs:
+                        await self.next.put(output)
+            finally:
+                # Only idle once outputs are queued downstream, so a drain
+                # never sees an empty stage with work still in its hands
+                self.in_flight -= len(items)
+
+    def stats(self) -> dict:
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'concurrency': self.concurrency,
+            'batch_size': self.batch_size,
+            'processed': self.processed,
+            'emitted': self.emitted,
+            'batches': self.batches,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'dropped': self.dropped,
+            'avg_batch': round(self.processed / self.batches, 1) if self.batches else 0,
+            'avg_batch_ms': round(self.busy_seconds / self.batches * 1000, 3) if self.batches else 0,
+            'max_batch_ms': round(self.max_batch_seconds * 1000, 3),
+            'avg_queue_wait_ms': round(self.wait_seconds / self.batches * 1000, 3) if self.batches else 0,
+            'throughput_per_sec': round(self.processed / uptime, 1) if uptime else 0,
+            # Fraction of worker time spent busy; ~1.0 marks the bottleneck
+            'utilization': round(self.busy_seconds / (uptime * self.concurrency), 3) if uptime else 0,
+        }
+
+
+class Pipeline:
+    """Chains the configured stages in STAGE_NAMES order, except SIDE_STAGES"""
+
+    def __init__(self, handlers: Dict[str, Callable], config: Optional[Dict[str, dict]] = None):
+        self.handlers = handlers
+        self.config = config or load_pipeline_config()
+        self.stages: Dict[str, Stage] = {}
+
+    def start(self):
+        """Create queues and workers (must run inside the event loop)"""
+        previous = None
+        for name in STAGE_NAMES:
+            cfg = self.config[name]
+            stage = Stage(
+                name, self.handlers[name], cfg['queue_size'], cfg['concurrency'],
+                cfg['batch_size'], cfg.get('offload', False)
+            )
+            self.stages[name] = stage
+            if name in SIDE_STAGES:
+                continue
+            if previous is not None:
+                previous.next = stage
+            previous = stage
+        for stage in self.stages.values():
+            stage.start()
+        logger.info("✅ Detection pipeline started: " + " -> ".join(
+            f"{n}(x{s.concurrency}, batch {s.batch_size})" for n, s in self.stages.items()
+            if n not in SIDE_STAGES
+        ) + " | side: " + ", ".join(SIDE_STAGES))
+
+    async def drain(self, timeout: float = DRAIN_SECONDS) -> bool:
+        """Wait until every stage is idle, upstream first; False on timeout"""
+        deadline = time.perf_counter() + timeout
+        for stage in self.stages.values():
+            while not stage.idle():
+                if time.perf_counter() >= deadline:
+                    return False
+                await asyncio.sleep(0.05)
+        return True
+
+    async def stop(self, timeout: float = DRAIN_SECONDS):
+        """Drain queued work (up to `timeout` seconds), then cancel the workers"""
+        if not await self.drain(timeout):
+            left = {n: s.queue.qsize() + s.in_flight for n, s in self.stages.items() if not s.idle()}
+            logger.warning(f"⚠️ Pipeline did not drain within {timeout:.0f}s, discarding: {left}")
+        for stage in self.stages.values():
+            await stage.stop()
+
+    async def submit(self, items: list, stage: str = 'ingest'):
+        """Queue items at a stage, waiting while the stage's queue is full"""
+        target = self.stages[stage]
+        for item in items:
+            await target.put(item)
+
+    def offer(self, items: list, stage: str) -> int:
+        """Queue items at a stage without waiting; returns how many were dropped"""
+        target = self.stages[stage]
+        return sum(not target.offer(item) for item in items)
+
+    def stats(self) -> dict:
+        stats = {name: stage.stats() for name, stage in self.stages.items()}
+        busiest = max(stats, key=lambda n: stats[n]['utilization']) if stats else None
+        return {'stages': stats, 'bottleneck': busiest}
@@ -0,0 +1,75 @@
+"""
+Rate Limiting for HoneyCloud-X
+Compact sliding-window counters keyed by IP, username or any string
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window rate limiter using the two-counter approximation.
+
+    Each key stores only (window_start, current_count, previous_count);
+    the rate over the last `window` seconds is estimated by weighting the
+    previous window's count by how much of it still overlaps. Memory is
+    bounded by `max_keys`: keys are kept in least-recently-used order and
+    a full table evicts the least recently seen key in O(1).
+    """
+
+    def __init__(self, limit: int, window: float, max_keys: int = 100000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        # key -> slot, least recently used first
+        self._slots: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _slot(self, key: str, now: float) -> List:
+        slot = self._slots.get(key)
+        start = now - (now % self.window)
+        if slot is None:
+            while len(self._slots) >= self.max_keys:
+                self._slots.popitem(last=False)
+            slot = [start, 0, 0]
+            self._slots[key] = slot
+            return slot
+        self._slots.move_to_end(key)
+        if slot[0] != start:
+            # Roll forward: the old current window becomes previous if adjacent
+            slot[2] = slot[1] if start - slot[0] == self.window else 0
+            slot[1] = 0
+            slot[0] = start
+        return slot
+
+    def _estimate(self, slot: List, now: float) -> float:
+        elapsed = (now - slot[0]) / self.window
+        return slot[1] + slot[2] * (1.0 - elapsed)
+
+    def hit(self, key: str, now: Optional[float] = None) -> float:
+        """Record one request and return the estimated rate in the window"""
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slot(key, now)
+            slot[1] += 1
+            return self._estimate(slot, now)
+
+    def rate(self, key: str, now: Optional[float] = None) -> float:
+        """Estimated requests in the last window without recording one"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if key not in self._slots:
+                return 0.0
+            return self._estimate(self._slot(key, now), now)
+
+    def is_limited(self, key: str, now: Optional[float] = None) -> bool:
+        return self.rate(key, now) >= self.limit
+
+    def reset(self, key: str):
+        with self._lock:
+            self._slots.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._slots)
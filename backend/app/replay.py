@@ -0,0 +1,121 @@
+"""
+Event Log Replay for HoneyCloud-X
+Feeds the binary event log back through MLThreatDetector and the stats
+aggregators, e.g. to re-score history after retraining the model.
+
+Usage (from backend/):
+    python -m app.replay --since 2026-01-01T00:00 --until 2026-01-08T00:00
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+
+from .event_log import EVENT_LOG_DIR, EventLogReader
+from .sketches import TRACKED_FIELDS, HyperLogLog, SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 4096
+
+
+class ReplayStats:
+    """Counts matching /api/stats plus top-K and unique-IP sketches over the replay"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_service = {}
+        self.by_severity = {}
+        self.by_label = {}
+        self.relabelled = 0
+        self.topk = {field: SpaceSaving() for field in TRACKED_FIELDS}
+        self.unique_ips = HyperLogLog()
+
+    def add(self, event: dict):
+        self.total += 1
+        for counts, key in (
+            (self.by_service, event.get('service')),
+            (self.by_severity, event.get('severity')),
+            (self.by_label, event.get('ai_label')),
+        ):
+            counts[key] = counts.get(key, 0) + 1
+        for field in TRACKED_FIELDS:
+            if event.get(field):
+                self.topk[field].add(str(event[field]))
+        if event.get('source_ip'):
+            self.unique_ips.add(event['source_ip'])
+
+    def summary(self, top: int = 10) -> dict:
+        return {
+            'total_events': self.total,
+            'events_by_service': self.by_service,
+            'events_by_severity': self.by_severity,
+            'ai_labels': self.by_label,
+            'relabelled_by_ml': self.relabelled,
+            'unique_source_ips': self.unique_ips.count() if self.total else 0,
+            'top': {field: self.topk[field].top(top) for field in TRACKED_FIELDS},
+        }
+
+
+def replay(log_dir: str = EVENT_LOG_DIR, since: datetime = None, until: datetime = None,
+           use_ml: bool = True, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Replay events from the log through the ML engine and stats aggregation.
+
+    Returns:
+        Summary dict with counts, sketches and throughput
+    """
+    detector = None
+    if use_ml:
+        try:
+            from .ml_engine import MLThreatDetector
+            detector = MLThreatDetector()
+        except ImportError as e:
+            logger.warning(f"ML engine not available, replaying stats only: {e}")
+
+    stats = ReplayStats()
+    start = time.perf_counter()
+
+    def flush(batch):
+        if detector is not None:
+            for event, prediction in zip(batch, detector.predict_batch(batch)):
+                if prediction['label'] != event.get('ai_label'):
+                    stats.relabelled += 1
+                event['ai_label'] = prediction['label']
+                event['threat_score'] = prediction['score']
+        for event in batch:
+            stats.add(event)
+
+    batch = []
+    for event in EventLogReader(log_dir).scan(since, until):
+        batch.append(event)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    elapsed = time.perf_counter() - start
+    summary = stats.summary()
+    summary['elapsed_seconds'] = round(elapsed, 3)
+    summary['events_per_second'] = round(stats.total / elapsed) if elapsed > 0 else 0
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the HoneyCloud-X event log")
+    parser.add_argument('--log-dir', default=EVENT_LOG_DIR)
+    parser.add_argument('--since', type=datetime.fromisoformat, default=None)
+    parser.add_argument('--until', type=datetime.fromisoformat, default=None)
+    parser.add_argument('--no-ml', action='store_true', help="Skip ML re-scoring")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    summary = replay(args.log_dir, args.since, args.until, not args.no_ml, args.batch_size)
+    print(json.dumps(summary, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 """
 Report Generator for HoneyCloud-X
-Generates CSV reports of attack events
+Generates CSV, text and NDJSON reports of attack events
 """
 import csv
 import logging
@@ -46,6 +46,34 @@ def generate_csv_report(events: List[dict], filename: str = None) -> str:
         raise
 
 
+def generate_ndjson_report(lines: List[bytes], filename: str = None) -> str:
+    """
+    Generate an NDJSON export from pre-serialized events.
+    
+    Args:
+        lines: One JSON-encoded event per item (no trailing newline)
+        filename: Output filename (optional)
+        
+    Returns:
+        Path to generated NDJSON file
+    """
+    if not filename:
+        filename = f"reports/attack_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
+    
+    try:
+        with open(filename, 'wb') as f:
+            for line in lines:
+                f.write(line)
+                f.write(b'\n')
+        
+        logger.info(f"✅ NDJSON export generated: {filename}")
+        return filename
+    
+    except Exception as e:
+        logger.error(f"❌ Error generating NDJSON export: {e}")
+        raise
+
+
 def generate_pdf_report(events: List[dict], stats: dict, filename: str = None) -> str:
     """
     Generate a simple text-based report (PDF generation requires matplotlib).
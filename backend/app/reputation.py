@@ -0,0 +1,227 @@
+"""
+IP Reputation for HoneyCloud-X
+Tags events whose source_ip falls in known-bad CIDR lists (Tor exits,
+scanners, threat intel) loaded from local files.
+
+Lists are plain text files in REPUTATION_DIR, one IP or CIDR per line
+('#' comments allowed); the file name (without extension) becomes the tag.
+CIDRs are stored in a path-compressed binary (Patricia) trie per address
+family, so a lookup visits at most one node per prefix bit. Reloads build a
+new trie off to the side and swap it in with a single assignment.
+"""
+import logging
+import os
+import socket
+import threading
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPUTATION_DIR = os.getenv("HONEYCLOUD_REPUTATION_DIR", "data/reputation")
+LIST_EXTENSIONS = ('.txt', '.list', '.netset', '.ipset')
+
+# Each matching list raises threat_score by this much (capped at 1.0)
+REPUTATION_SCORE_BOOST = 0.2
+SEVERITY_ORDER = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+
+
+class _Node:
+    __slots__ = ('key', 'length', 'children', 'tags')
+
+    def __init__(self, key: int, length: int, tags: tuple = ()):
+        self.key = key
+        self.length = length
+        self.children = [None, None]
+        self.tags = tags
+
+
+class PrefixTrie:
+    """Path-compressed binary trie of CIDR prefixes for one address width"""
+
+    def __init__(self, width: int):
+        self.width = width
+        self._masks = [((1 << n) - 1) << (width - n) for n in range(width + 1)]
+        self.root = _Node(0, 0)
+        self.prefixes = 0
+
+    def _bit(self, key: int, position: int) -> int:
+        return (key >> (self.width - 1 - position)) & 1
+
+    def insert(self, key: int, length: int, tag: str):
+        """Add prefix `key/length` (key left-aligned in `width` bits) with a tag"""
+        key &= self._masks[length]
+        node = self.root
+        while True:
+            if length == node.length:
+                if tag not in node.tags:
+                    if not node.tags:
+                        self.prefixes += 1
+                    node.tags += (tag,)
+                return
+            side = self._bit(key, node.length)
+            child = node.children[side]
+            if child is None:
+                node.children[side] = _Node(key, length, (tag,))
+                self.prefixes += 1
+                return
+
+            # Length of the common prefix of key and child.key, capped by both lengths
+            diff = (key ^ child.key) & self._masks[min(length, child.length)]
+            common = self.width - diff.bit_length() if diff else min(length, child.length)
+            if common >= child.length:
+                node = child
+                continue
+
+            # Split the compressed edge at `common`
+            split = _Node(key & self._masks[common], common)
+            split.children[self._bit(child.key, common)] = child
+            if common == length:
+                split.tags = (tag,)
+            else:
+                split.children[self._bit(key, common)] = _Node(key, length, (tag,))
+            node.children[side] = split
+            self.prefixes += 1
+            return
+
+    def lookup(self, key: int) -> Tuple[str, ...]:
+        """Tags of every prefix containing `key`"""
+        tags = ()
+        masks = self._masks
+        node = self.root
+        while node is not None:
+            if (key ^ node.key) & masks[node.length]:
+                break
+            if node.tags:
+                tags += node.tags
+            if node.length == self.width:
+                break
+            node = node.children[(key >> (self.width - 1 - node.length)) & 1]
+        return tags
+
+
+class ReputationIndex:
+    """IPv4 + IPv6 tries built from a set of named lists"""
+
+    def __init__(self):
+        self.v4 = PrefixTrie(32)
+        self.v6 = PrefixTrie(128)
+        self.lists: Dict[str, int] = {}
+
+    def add(self, cidr: str, tag: str) -> bool:
+        # inet_pton is much cheaper than ipaddress.ip_network on large lists
+        address, _, prefix = cidr.strip().partition('/')
+        family, trie = (socket.AF_INET6, self.v6) if ':' in address else (socket.AF_INET, self.v4)
+        try:
+            key = int.from_bytes(socket.inet_pton(family, address), 'big')
+            length = int(prefix) if prefix else trie.width
+        except (OSError, ValueError):
+            return False
+        if not 0 <= length <= trie.width:
+            return False
+        trie.insert(key, length, tag)
+        self.lists[tag] = self.lists.get(tag, 0) + 1
+        return True
+
+    def match(self, ip: str) -> Tuple[str, ...]:
+        family, trie = (socket.AF_INET6, self.v6) if ':' in ip else (socket.AF_INET, self.v4)
+        try:
+            key = int.from_bytes(socket.inet_pton(family, ip), 'big')
+        except (OSError, ValueError):
+            return ()
+        tags = trie.lookup(key)
+        return tuple(sorted(set(tags))) if len(tags) > 1 else tags
+
+
+def load_lists(directory: str) -> ReputationIndex:
+    """Build an index from every list file in `directory`"""
+    index = ReputationIndex()
+    if not os.path.isdir(directory):
+        return index
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext not in LIST_EXTENSIONS:
+            continue
+        skipped = 0
+        with open(os.path.join(directory, name), encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                entry = line.split('#', 1)[0].strip()
+                if entry and not index.add(entry.split()[0], stem):
+                    skipped += 1
+        if skipped:
+            logger.warning(f"Reputation list {name}: skipped {skipped} invalid entries")
+    return index
+
+
+class ReputationService:
+    """Holds the current index and hot-reloads it when list files change"""
+
+    def __init__(self, directory: str = REPUTATION_DIR):
+        self.directory = directory
+        self.index = ReputationIndex()
+        self._signature = None
+        self._reload_lock = threading.Lock()
+
+    def _dir_signature(self) -> Optional[tuple]:
+        if not os.path.isdir(self.directory):
+            return None
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if os.path.splitext(name)[1] in LIST_EXTENSIONS:
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((name, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if list files changed; returns True if swapped"""
+        with self._reload_lock:
+            signature = self._dir_signature()
+            if not force and signature == self._signature:
+                return False
+            index = load_lists(self.directory)
+            # Single reference assignment: readers see either the old or new index
+            self.index = index
+            self._signature = signature
+        logger.info(f"✅ Reputation lists loaded: {index.lists or 'none'}")
+        return True
+
+    def match(self, ip: str) -> Tuple[str, ...]:
+        return self.index.match(ip)
+
+    def tag(self, event: dict) -> dict:
+        """Set event['reputation'] to the matching lists (enrichment only)"""
+        tags = self.match(event.get('source_ip') or '')
+        if tags:
+            event['reputation'] = list(tags)
+        return event
+
+    @staticmethod
+    def raise_severity(event: dict) -> dict:
+        """Bump severity one level for a tagged event"""
+        severity = event.get('severity')
+        if event.get('reputation') and severity in SEVERITY_ORDER:
+            event['severity'] = SEVERITY_ORDER[min(SEVERITY_ORDER.index(severity) + 1, len(SEVERITY_ORDER) - 1)]
+        return event
+
+    @staticmethod
+    def raise_score(event: dict) -> dict:
+        """Add REPUTATION_SCORE_BOOST per matching list to threat_score"""
+        tags = event.get('reputation')
+        if tags:
+            score = float(event.get('threat_score') or 0.0)
+            event['threat_score'] = round(min(1.0, score + REPUTATION_SCORE_BOOST * len(tags)), 3)
+        return event
+
+    def apply(self, event: dict) -> dict:
+        """Tag the event with matching lists and raise severity/threat_score"""
+        return self.raise_score(self.raise_severity(self.tag(event)))
+
+    def summary(self) -> dict:
+        return {
+            'directory': self.directory,
+            'lists': dict(self.index.lists),
+            'ipv4_prefixes': self.index.v4.prefixes,
+            'ipv6_prefixes': self.index.v6.prefixes,
+        }
+
+
+reputation = ReputationService()
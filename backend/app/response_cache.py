@@ -0,0 +1,111 @@
+"""
+Response Cache for HoneyCloud-X
+Dashboard endpoints poll every few seconds, mostly for data that has not
+changed. A global data version is bumped on every ingested event; responses
+are cached as serialized JSON bytes keyed by (endpoint, params) and tagged
+with the version they were built at.
+
+The ETag is derived from (process epoch, version, endpoint, params) alone,
+so a poll whose If-None-Match is still current gets a 304 without touching
+the data, and concurrent dashboards share one serialization per data
+version. The random per-process epoch keeps a tag issued before a restart
+(when the version counter starts again at 0) from matching new data.
+
+The cache is bounded both by entry count and by total body bytes.
+"""
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from .metrics import registry
+from .serialization import dumps
+
+MAX_ENTRIES = 512
+MAX_BYTES = 64 * 1024 * 1024
+# Authenticated data: browsers may keep it but must revalidate every time
+CACHE_CONTROL = "private, no-cache"
+
+response_cache_requests = registry.counter(
+    'honeycloud_response_cache_requests_total', 'Cached endpoint requests by outcome', ('endpoint', 'result'))
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.epoch = uuid.uuid4().hex[:8]
+        self.version = 0
+        self.updated_at = time.time()
+        # (endpoint, params) -> (version, body)
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        """Mark the data as changed; every cached response becomes stale"""
+        self.version += 1
+        self.updated_at = time.time()
+
+    def etag(self, endpoint: str, params: tuple, version: int) -> str:
+        return f'"{self.epoch}-{version:x}-{zlib.crc32(repr((endpoint, params)).encode()):08x}"'
+
+    def get(self, endpoint: str, params: tuple, build: Callable[[], Any]) -> Tuple[str, bytes]:
+        """
+        Serialized response for the current data version, building it on a miss.
+        `build` may return ready-made JSON bytes or data to serialize.
+
+        Returns:
+            (etag, JSON bytes)
+        """
+        key = (endpoint, params)
+        version = self.version
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                response_cache_requests.inc(endpoint=endpoint, result='hit')
+                return self.etag(endpoint, params, version), entry[1]
+
+        data = build()
+        body = data if isinstance(data, bytes) else dumps(data)
+        # A body that would take over the whole budget is served but not kept
+        if len(body) <= self.max_bytes // 4:
+            with self._lock:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= len(old[1])
+                self._entries[key] = (version, body)
+                self._bytes += len(body)
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+        response_cache_requests.inc(endpoint=endpoint, result='miss')
+        return self.etag(endpoint, params, version), body
+
+    def respond(self, request: Request, endpoint: str, params: tuple, build: Callable[[], Any]) -> Response:
+        """JSON response with ETag, or 304 if the client's copy is current"""
+        headers = {"Cache-Control": CACHE_CONTROL}
+        current = self.etag(endpoint, params, self.version)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if current in tags or "*" in tags:
+                response_cache_requests.inc(endpoint=endpoint, result='not_modified')
+                return Response(status_code=304, headers={**headers, "ETag": current})
+
+        etag, body = self.get(endpoint, params, build)
+        return Response(content=body, media_type="application/json", headers={**headers, "ETag": etag})
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+response_cache = ResponseCache()
@@ -1,7 +1,30 @@
-# Pydantic schemas (placeholder)
-from pydantic import BaseModel
+# Pydantic schemas
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# Reserved for the built-in demo history, which is never logged, alerted on
+# or forwarded; outside input may not claim it
+SAMPLE_SENSOR_ID = "sample"
+
 
 class AttackEventCreate(BaseModel):
-    source_ip: str
-    service: str
-    severity: str
+    source_ip: str = Field(max_length=45)
+    service: str = Field(max_length=20)
+    severity: Optional[str] = Field(default=None, max_length=20)
+    timestamp: Optional[datetime] = None
+    source_port: Optional[int] = Field(default=None, ge=0, le=65535)
+    username: Optional[str] = Field(default=None, max_length=255)
+    password: Optional[str] = Field(default=None, max_length=255)
+    payload: Optional[str] = Field(default=None, max_length=65536)
+    command: Optional[str] = Field(default=None, max_length=500)
+    user_agent: Optional[str] = Field(default=None, max_length=500)
+    sensor_id: Optional[str] = Field(default=None, max_length=64)
+
+    @field_validator('sensor_id')
+    @classmethod
+    def sensor_id_not_reserved(cls, value: Optional[str]) -> Optional[str]:
+        if value == SAMPLE_SENSOR_ID:
+            raise ValueError(f"sensor_id '{SAMPLE_SENSOR_ID}' is reserved")
+        return value
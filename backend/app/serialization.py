@@ -0,0 +1,39 @@
+"""
+JSON Serialization for HoneyCloud-X
+orjson when installed (several times faster than the stdlib encoder and
+returns bytes directly), stdlib json otherwise.
+
+Events are serialized once when they are stored; list responses, SSE and
+NDJSON exports splice those cached bytes instead of re-encoding dicts.
+"""
+import json
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=str, option=_OPTIONS)
+else:
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':'), default=str).encode()
+
+
+def join_array(items: Iterable[bytes]) -> bytes:
+    """A JSON array from already-serialized elements"""
+    return b'[' + b','.join(items) + b']'
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,219 @@
+"""
+Session Reconstruction for HoneyCloud-X
+Groups raw events into attacker sessions keyed by (source_ip, source_port).
+
+Active sessions live in an OrderedDict ordered by last activity, so expiring
+idle sessions only touches the oldest entries. Each session keeps a fixed
+amount of state (counters, a capped command sample and tool set), and the
+table is capped at MAX_ACTIVE_SESSIONS; when full the least recently active
+session is closed early. A half-open session (no commands yet) costs roughly
+400 bytes, so a million of them stay under ~400 MB.
+
+Honeypots report a dropped connection with close(); the session is closed
+on the next sweep after DISCONNECT_GRACE seconds, so commands still making
+their way through the pipeline land in it rather than in a new session.
+"""
+import itertools
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+IDLE_TIMEOUT = 300.0
+MAX_ACTIVE_SESSIONS = 1_000_000
+MAX_COMPLETED_SESSIONS = 10000
+MAX_COMMAND_SAMPLE = 10
+MAX_TOOLS = 16
+DISCONNECT_GRACE = 2.0
+
+SEVERITY_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2, 'CRITICAL': 3}
+_COMMAND_SPLIT = re.compile(r'[;|&]+')
+
+
+def extract_tools(command: str) -> List[str]:
+    """Program names invoked by a shell command line (e.g. 'cd /tmp; wget x' -> cd, wget)"""
+    tools = []
+    for part in _COMMAND_SPLIT.split(command):
+        words = part.split()
+        if words:
+            tools.append(words[0].rsplit('/', 1)[-1])
+    return tools
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+class Session:
+    __slots__ = (
+        'source_ip', 'source_port', 'service', 'username', 'first_seen', 'last_seen',
+        'last_activity', 'event_count', 'command_count', 'commands', 'tools',
+        'max_severity', 'max_threat_score', 'close_reason',
+    )
+
+    def __init__(self, key: Tuple[str, int], event: dict, now: float):
+        self.source_ip, self.source_port = key
+        self.service = event.get('service')
+        self.username = event.get('username')
+        self.first_seen = event.get('timestamp')
+        self.last_seen = self.first_seen
+        self.last_activity = now
+        self.event_count = 0
+        self.command_count = 0
+        # Allocated on first command; most half-open sessions never send one
+        self.commands = ()
+        self.tools = ()
+        self.max_severity = 'LOW'
+        self.max_threat_score = 0.0
+        self.close_reason = None
+
+    def add(self, event: dict, now: float):
+        self.event_count += 1
+        self.last_seen = event.get('timestamp') or self.last_seen
+        self.last_activity = now
+        if event.get('username') and not self.username:
+            self.username = event['username']
+        command = event.get('command')
+        if command:
+            self.command_count += 1
+            if len(self.commands) < MAX_COMMAND_SAMPLE:
+                self.commands += (command[:200],)
+            for tool in extract_tools(command):
+                if tool not in self.tools and len(self.tools) < MAX_TOOLS:
+                    self.tools += (tool,)
+        severity = event.get('severity')
+        if SEVERITY_RANK.get(severity, -1) > SEVERITY_RANK[self.max_severity]:
+            self.max_severity = severity
+        score = event.get('threat_score') or 0.0
+        if score > self.max_threat_score:
+            self.max_threat_score = score
+
+    def duration(self) -> float:
+        try:
+            return max(0.0, (_as_datetime(self.last_seen) - _as_datetime(self.first_seen)).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            'source_ip': self.source_ip,
+            'source_port': self.source_port,
+            'service': self.service,
+            'username': self.username,
+            'start': self.first_seen,
+            'end': self.last_seen,
+            'duration_seconds': self.duration(),
+            'event_count': self.event_count,
+            'command_count': self.command_count,
+            'distinct_tools': sorted(self.tools),
+            'commands': list(self.commands),
+            'severity': self.max_severity,
+            'threat_score': self.max_threat_score,
+            'close_reason': self.close_reason,
+        }
+
+
+class Sessionizer:
+    """Streaming sessionizer with idle-timeout expiry and a bounded session table"""
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, max_sessions: int = MAX_ACTIVE_SESSIONS,
+                 max_completed: int = MAX_COMPLETED_SESSIONS):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._active: "OrderedDict[Tuple[str, int], Session]" = OrderedDict()
+        # key -> monotonic time after which a disconnected session is closed
+        self._disconnected: Dict[Tuple[str, int], float] = {}
+        self._pending: List[Session] = []
+        self.completed = deque(maxlen=max_completed)
+        self._lock = threading.Lock()
+
+    def add(self, event: dict, now: Optional[float] = None):
+        """Attach an event to its session"""
+        if not event.get('source_ip'):
+            return
+        now = time.monotonic() if now is None else now
+        key = (event['source_ip'], int(event.get('source_port') or 0))
+
+        with self._lock:
+            session = self._active.get(key)
+            if session is None:
+                if len(self._active) >= self.max_sessions:
+                    _, oldest = self._active.popitem(last=False)
+                    self._close(oldest, 'evicted')
+                session = Session(key, event, now)
+                self._active[key] = session
+            else:
+                self._active.move_to_end(key)
+            session.add(event, now)
+
+    def close(self, source_ip: str, source_port: int, now: Optional[float] = None):
+        """Connection dropped: close the session once in-flight events have landed"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._disconnected[(source_ip, int(source_port or 0))] = now + DISCONNECT_GRACE
+
+    def _close(self, session: Session, reason: str):
+        session.close_reason = reason
+        self._pending.append(session)
+
+    def expire(self, now: Optional[float] = None) -> List[Session]:
+        """Close idle sessions and return every session completed since the last call"""
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.idle_timeout
+        with self._lock:
+            for key, deadline in list(self._disconnected.items()):
+                if deadline > now:
+                    continue
+                del self._disconnected[key]
+                session = self._active.pop(key, None)
+                if session is not None:
+                    self._close(session, 'disconnect')
+            while self._active:
+                key, session = next(iter(self._active.items()))
+                if session.last_activity > cutoff:
+                    break
+                del self._active[key]
+                self._close(session, 'idle_timeout')
+            done, self._pending = self._pending, []
+        return done
+
+    def publish(self, sessions: List[dict]):
+        """Store scored sessions for /api/sessions (newest last)"""
+        with self._lock:
+            self.completed.extend(sessions)
+
+    def active(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return [s.to_dict() for s in itertools.islice(reversed(self._active.values()), limit)]
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return list(reversed(self.completed))[:limit]
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+
+def score_sessions(sessions: List[Session], detector=None) -> List[dict]:
+    """
+    Turn completed sessions into dicts scored as a whole. The session keeps
+    the worse of the ML session score and its highest per-event score.
+    """
+    results = [s.to_dict() for s in sessions]
+    predictions = detector.predict_session_batch(results) if detector is not None else [None] * len(results)
+    for result, prediction in zip(results, predictions):
+        if prediction is None:
+            if result['severity'] in ('HIGH', 'CRITICAL'):
+                label = 'malicious'
+            else:
+                label = 'anomaly' if result['command_count'] else 'benign'
+            prediction = {'label': label, 'score': 0.0}
+        result['ai_label'] = prediction['label']
+        result['threat_score'] = max(result['threat_score'], prediction['score'])
+    return results
+
+
+# Global sessionizer fed by the persist stage and notified by the honeypots
+attack_sessions = Sessionizer()
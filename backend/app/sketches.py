@@ -0,0 +1,263 @@
+"""
+Streaming Sketches for HoneyCloud-X
+Bounded-memory heavy hitters (Space-Saving) and unique counts (HyperLogLog)
+maintained per sliding window at ingest time.
+
+Error bounds:
+    Space-Saving with capacity m over a stream of N items never underestimates
+    a count and overestimates it by at most N / m. Each reported item carries
+    its own ``error`` so the guaranteed count is ``count - error``.
+
+    HyperLogLog with 2^p registers has a relative standard error of
+    1.04 / sqrt(2^p) (p=12 -> ~1.6%).
+"""
+import hashlib
+import heapq
+import math
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Event fields tracked by the leaderboards
+TRACKED_FIELDS = ('source_ip', 'username', 'password', 'command')
+
+# Sliding window layout: 60 one-minute buckets = last hour
+BUCKET_SECONDS = 60
+BUCKET_COUNT = 60
+
+# Per-bucket sketch sizes
+TOPK_CAPACITY = 256
+HLL_PRECISION = 12
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash of a string"""
+    digest = hashlib.blake2b(value.encode('utf-8', errors='ignore'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with a fixed number of counters.
+
+    Evictions use a lazily updated min-heap of (count, item): increments only
+    touch `counts`, and a heap entry whose count went stale is refreshed when
+    it reaches the top, so eviction costs O(log m) amortized instead of a
+    scan over all m counters.
+    """
+
+    def __init__(self, capacity: int = TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.total = 0
+        # One entry per tracked item; its count may lag behind `counts`
+        self._heap: List[Tuple[int, str]] = []
+
+    def _min_item(self) -> str:
+        """Tracked item with the smallest count (refreshes stale heap entries)"""
+        heap = self._heap
+        while True:
+            count, item = heap[0]
+            current = self.counts[item]
+            if count == current:
+                return item
+            heapq.heapreplace(heap, (current, item))
+
+    def add(self, item: str, count: int = 1):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+        # Evict the minimum counter and inherit its count as error
+        victim = self._min_item()
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim)
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+        heapq.heapreplace(self._heap, (floor + count, item))
+
+    def min_count(self) -> int:
+        """Upper bound on the count of any item not currently tracked"""
+        if len(self.counts) < self.capacity:
+            return 0
+        return self.counts[self._min_item()]
+
+    def top(self, k: int) -> List[dict]:
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return [
+            {'value': item, 'count': count, 'error': self.errors[item]}
+            for item, count in ranked
+        ]
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality estimator backed by a bytearray of registers"""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, item: str):
+        x = _hash64(item)
+        idx = x >> (64 - self.p)
+        rest = (x << self.p) & 0xFFFFFFFFFFFFFFFF
+        rank = 1
+        while rank <= 64 - self.p and not (rest & 0x8000000000000000):
+            rank += 1
+            rest <<= 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        regs = self.registers
+        for i, r in enumerate(other.registers):
+            if r > regs[i]:
+                regs[i] = r
+
+    def count(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class _Bucket:
+    __slots__ = ('start', 'events', 'topk', 'unique_ips')
+
+    def __init__(self, start: int):
+        self.start = start
+        self.events = 0
+        self.topk = {field: SpaceSaving() for field in TRACKED_FIELDS}
+        self.unique_ips = HyperLogLog()
+
+
+class WindowedSketches:
+    """
+    Ring of per-minute buckets, each holding a Space-Saving summary per
+    tracked field and a HyperLogLog of source IPs. Queries merge the
+    buckets that fall inside the requested window.
+    """
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS, bucket_count: int = BUCKET_COUNT):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_count = bucket_count
+        self._buckets: List[Optional[_Bucket]] = [None] * bucket_count
+        self._lock = threading.Lock()
+
+    @property
+    def max_window(self) -> int:
+        return self.bucket_seconds * self.bucket_count
+
+    def _event_time(self, event: dict) -> float:
+        ts = event.get('timestamp')
+        if isinstance(ts, datetime):
+            return ts.timestamp()
+        if isinstance(ts, str):
+            try:
+                return datetime.fromisoformat(ts).timestamp()
+            except ValueError:
+                pass
+        return time.time()
+
+    def add(self, event: dict):
+        """Update the bucket covering the event's timestamp"""
+        now = time.time()
+        ts = self._event_time(event)
+        # Outside the ring: too old, or too far ahead to be clock skew
+        if ts < now - self.max_window or ts > now + self.bucket_seconds:
+            return
+        # Slightly-ahead sensor clocks count as now instead of claiming a future slot
+        ts = min(ts, now)
+        start = int(ts // self.bucket_seconds) * self.bucket_seconds
+        slot = (start // self.bucket_seconds) % self.bucket_count
+
+        with self._lock:
+            bucket = self._buckets[slot]
+            if bucket is not None and bucket.start > start:
+                # Late event for a slot already reused by a newer minute
+                return
+            if bucket is None or bucket.start != start:
+                # Only ever reset a slot going forward in time
+                bucket = _Bucket(start)
+                self._buckets[slot] = bucket
+            bucket.events += 1
+            for field in TRACKED_FIELDS:
+                value = event.get(field)
+                if value:
+                    bucket.topk[field].add(str(value))
+            if event.get('source_ip'):
+                bucket.unique_ips.add(event['source_ip'])
+
+    def _live_buckets(self, window: int) -> List[_Bucket]:
+        window = max(self.bucket_seconds, min(window, self.max_window))
+        cutoff = time.time() - window
+        return [
+            b for b in self._buckets
+            if b is not None and b.start + self.bucket_seconds > cutoff
+        ]
+
+    def top(self, field: str, k: int = 20, window: int = 3600) -> dict:
+        """Merge per-bucket summaries into a top-k leaderboard"""
+        with self._lock:
+            buckets = self._live_buckets(window)
+            counts: Dict[str, int] = {}
+            errors: Dict[str, int] = {}
+            total = 0
+            for b in buckets:
+                summary = b.topk[field]
+                total += summary.total
+                for item, count in summary.counts.items():
+                    counts[item] = counts.get(item, 0) + count
+                    errors[item] = errors.get(item, 0) + summary.errors[item]
+            # An item missing from a full bucket may still have up to min_count there
+            for b in buckets:
+                summary = b.topk[field]
+                floor = summary.min_count()
+                if floor:
+                    for item in counts:
+                        if item not in summary.counts:
+                            counts[item] += floor
+                            errors[item] += floor
+
+        ranked = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        return {
+            'field': field,
+            'window_seconds': min(window, self.max_window),
+            'total': total,
+            'max_error': total // TOPK_CAPACITY,
+            'top': [
+                {'value': item, 'count': count, 'error': errors[item]}
+                for item, count in ranked
+            ],
+        }
+
+    def unique(self, window: int = 3600) -> dict:
+        """Estimate distinct source IPs seen in the window"""
+        merged = HyperLogLog()
+        with self._lock:
+            buckets = self._live_buckets(window)
+            events = sum(b.events for b in buckets)
+            for b in buckets:
+                merged.merge(b.unique_ips)
+        return {
+            'window_seconds': min(window, self.max_window),
+            'events': events,
+            'unique_source_ips': merged.count() if events else 0,
+            'relative_error': round(1.04 / math.sqrt(merged.m), 4),
+        }
+
+
+# Global sketches updated at ingest
+attack_sketches = WindowedSketches()
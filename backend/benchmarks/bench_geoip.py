@@ -0,0 +1,66 @@
+"""
+GeoIP lookup benchmark for HoneyCloud-X
+Builds a synthetic full-IPv4 range table (default 600k ranges, roughly the
+size of public country+ASN databases) and reports build time, memory
+footprint and lookups/sec for cold (uncached) and hot (LRU) lookups.
+
+Run from backend/:
+    python -m benchmarks.bench_geoip [ranges]
+"""
+import ipaddress
+import random
+import sys
+import time
+import tracemalloc
+
+from app.geoip import GeoIPEnricher, GeoIPIndex
+
+LOOKUPS = 200000
+COUNTRIES = ["US", "CN", "RU", "DE", "BR", "IN", "NL", "FR", "GB", "KR", "VN", "ZZ"]
+
+
+def synthetic_rows(count: int, rng: random.Random):
+    """Contiguous ranges covering the whole IPv4 space"""
+    boundaries = sorted(rng.sample(range(1, 2 ** 32), count - 1))
+    start = 0
+    for end in boundaries + [2 ** 32]:
+        asn = rng.randint(1, 70000)
+        yield start, end - 1, False, rng.choice(COUNTRIES), asn, f"AS{asn}"
+        start = end
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600000
+    rng = random.Random(42)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = GeoIPIndex.from_rows(synthetic_rows(count, rng))
+    build = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    enricher = GeoIPEnricher()
+    enricher._index = index
+
+    cold_ips = [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    for ip in cold_ips:
+        enricher._lookup(ip)
+    cold = time.perf_counter() - start
+
+    hot_ips = [rng.choice(cold_ips[:1000]) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    for ip in hot_ips:
+        enricher.lookup(ip)
+    hot = time.perf_counter() - start
+
+    print(f"ranges: {len(index):,}  distinct (country, asn, org) values: {len(index.values):,}")
+    print(f"build time          : {build:.2f}s")
+    print(f"index memory        : {current / 1e6:.1f} MB retained (peak while building {peak / 1e6:.1f} MB)")
+    print(f"uncached lookups/sec: {LOOKUPS / cold:,.0f}")
+    print(f"LRU-hot lookups/sec : {LOOKUPS / hot:,.0f}  {enricher.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
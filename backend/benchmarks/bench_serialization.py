@@ -0,0 +1,90 @@
+"""
+Event serialization benchmark for HoneyCloud-X
+Compares ways of producing the /api/events?limit=N body (default 10000):
+
+    fastapi   - jsonable_encoder + json.dumps (the default response path)
+    json      - stdlib json.dumps of the dicts
+    orjson    - orjson.dumps of the dicts
+    cached    - splicing per-event bytes serialized once at ingest
+
+Run from backend/:
+    python -m benchmarks.bench_serialization [events] [repeats]
+"""
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from app.traffic import TrafficGenerator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+
+def stored_events(count: int) -> list:
+    """Generator traffic shaped like events after the detection pipeline"""
+    rng = random.Random(42)
+    now = datetime.now()
+    events = TrafficGenerator(seed=42).take(count)
+    for i, event in enumerate(events, start=1):
+        event.update({
+            'id': i,
+            'service': event['service'].upper(),
+            'timestamp': (now - timedelta(seconds=i)).isoformat(),
+            'severity': rng.choice(('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')),
+            'ai_label': rng.choice(('benign', 'anomaly', 'malicious')),
+            'threat_score': round(rng.random(), 3),
+            'geolocation': {'country': 'US', 'asn': 64500, 'as_org': 'EXAMPLE-NET'},
+        })
+    return events
+
+
+def measure(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    events = stored_events(count)
+
+    cases = {}
+    if jsonable_encoder is not None:
+        cases['fastapi'] = lambda: json.dumps(jsonable_encoder(events)).encode()
+    cases['json'] = lambda: json.dumps(events, separators=(',', ':')).encode()
+    if orjson is not None:
+        cases['orjson'] = lambda: orjson.dumps(events)
+        cached = [orjson.dumps(e) for e in events]
+    else:
+        cached = [json.dumps(e, separators=(',', ':')).encode() for e in events]
+    cases['cached'] = lambda: b'[' + b','.join(cached) + b']'
+
+    size = len(cases['cached']())
+    print(f"events: {count}, body: {size / 1024:.0f} KiB, median of {repeats} runs")
+    baseline = None
+    for name, fn in cases.items():
+        elapsed = measure(fn, repeats)
+        baseline = baseline or elapsed
+        print(f"  {name:8s} {elapsed * 1000:8.2f} ms   {baseline / elapsed:6.1f}x")
+
+    if orjson is not None:
+        per_event = measure(lambda: [orjson.dumps(e) for e in events], repeats) / count
+        print(f"one-off cost at ingest: {per_event * 1e6:.2f} us/event (orjson)")
+
+
+if __name__ == "__main__":
+    main()
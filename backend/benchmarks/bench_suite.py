@@ -0,0 +1,338 @@
+"""
+End-to-end benchmark suite for HoneyCloud-X
+Starts the API, loads it with seeded synthetic traffic (app.traffic) and
+reports throughput, p50/p99 latency and memory for:
+
+    ingest   - POST /api/ingest batches
+    api      - concurrent dashboard reads (/api/events, /api/stats, top-K),
+               plus unchanged-data polling with If-None-Match (304)
+    sse      - fan-out delay from ingest to N connected /api/events/stream clients
+    reports  - CSV / text / Excel report generation over the loaded events
+    ml       - MLThreatDetector.predict_batch in-process
+
+Results are written to benchmarks/results/<timestamp>.json. With
+--compare (a results file, or "latest") every metric is checked against the
+earlier run and the exit code is 1 if any regressed by more than --threshold.
+
+Run from backend/:
+    python -m benchmarks.bench_suite [--events 20000] [--only ingest,api] [--compare latest]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from app.traffic import TrafficGenerator, login, percentile
+
+from .bench_cold_start import PORT, TIMEOUT, _wait_for
+
+BASE_URL = f"http://127.0.0.1:{PORT}"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SECTIONS = ("ingest", "api", "sse", "reports", "ml")
+
+
+def _rss_mb(pid: int):
+    """Resident memory of a process from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+
+
+def _request(path: str, token: str, data: bytes = None, content_type: str = None, etag: str = None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if content_type:
+        headers["Content-Type"] = content_type
+    if etag:
+        headers["If-None-Match"] = etag
+    request = urllib.request.Request(f"{BASE_URL}{path}", data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.read()
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return b""
+        raise
+
+
+def _etag(path: str, token: str) -> str:
+    request = urllib.request.Request(f"{BASE_URL}{path}", headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.headers.get("ETag")
+
+
+def _latency_summary(prefix: str, latencies: list, results: dict):
+    results[f"{prefix}_p50_ms"] = round(percentile(latencies, 50) * 1000, 2)
+    results[f"{prefix}_p99_ms"] = round(percentile(latencies, 99) * 1000, 2)
+
+
+def _ndjson(events: list) -> bytes:
+    return "\n".join(json.dumps(e) for e in events).encode()
+
+
+# ====================================
+# SECTIONS
+# ====================================
+
+def bench_ingest(token: str, generator: TrafficGenerator, events: int, batch_size: int, results: dict):
+    batches = [_ndjson(generator.take(batch_size)) for _ in range(max(1, events // batch_size))]
+    latencies = []
+    start = time.perf_counter()
+    for body in batches:
+        t = time.perf_counter()
+        _request("/api/ingest", token, body, "application/x-ndjson")
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    results["ingest_events_per_sec"] = round(len(batches) * batch_size / elapsed, 1)
+    _latency_summary("ingest_batch", latencies, results)
+
+
+def bench_api(token: str, clients: int, requests_per_client: int, results: dict):
+    endpoints = (
+        ("api_events", "/api/events?limit=100", False),
+        ("api_events_10000", "/api/events?limit=10000", False),
+        ("api_stats", "/api/stats", False),
+        ("api_stats_top", "/api/stats/top?field=source_ip&k=20", False),
+        ("api_stats_not_modified", "/api/stats", True),
+    )
+    for name, path, conditional in endpoints:
+        etag = _etag(path, token) if conditional else None
+        latencies = []
+        lock = threading.Lock()
+
+        def client():
+            local = []
+            for _ in range(requests_per_client):
+                t = time.perf_counter()
+                _request(path, token, etag=etag)
+                local.append(time.perf_counter() - t)
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        results[f"{name}_requests_per_sec"] = round(len(latencies) / elapsed, 1)
+        _latency_summary(name, latencies, results)
+
+
+def bench_sse(token: str, generator: TrafficGenerator, subscribers: int, events: int, results: dict):
+    """Time from the ingest POST until each subscriber has seen each event"""
+    marker = f"bench-sse-{os.getpid()}"
+    received = []
+    lock = threading.Lock()
+    connected = threading.Barrier(subscribers + 1)
+    sent_at = [0.0]
+
+    def subscriber():
+        request = urllib.request.Request(
+            f"{BASE_URL}/api/events/stream", headers={"Authorization": f"Bearer {token}"}
+        )
+        seen = []
+        with urllib.request.urlopen(request, timeout=120) as stream:
+            connected.wait()
+            while len(seen) < events:
+                line = stream.readline()
+                if not line:
+                    break
+                if line.startswith(b"data:") and marker.encode() in line:
+                    seen.append(time.perf_counter() - sent_at[0])
+        with lock:
+            received.extend(seen)
+
+    threads = [threading.Thread(target=subscriber, daemon=True) for _ in range(subscribers)]
+    for t in threads:
+        t.start()
+    connected.wait()
+    # Give every stream generator time to subscribe to the broadcaster
+    time.sleep(1.0)
+
+    batch = generator.take(events)
+    for event in batch:
+        event["sensor_id"] = marker
+    sent_at[0] = time.perf_counter()
+    _request("/api/ingest", token, _ndjson(batch), "application/x-ndjson")
+    for t in threads:
+        t.join(timeout=60)
+    elapsed = time.perf_counter() - sent_at[0]
+
+    results["sse_delivered_ratio"] = round(len(received) / (subscribers * events), 3)
+    results["sse_deliveries_per_sec"] = round(len(received) / elapsed, 1)
+    _latency_summary("sse_delivery", received, results)
+
+
+def bench_reports(token: str, results: dict):
+    for fmt in ("csv", "txt", "xlsx"):
+        t = time.perf_counter()
+        body = json.loads(_request(f"/api/reports/generate?format={fmt}", token, data=b""))
+        results[f"report_{fmt}_ms"] = round((time.perf_counter() - t) * 1000, 1)
+        try:
+            os.remove(os.path.join(BACKEND_DIR, body["filepath"]))
+        except (KeyError, OSError):
+            pass
+
+
+def bench_ml(generator: TrafficGenerator, events: int, batch_size: int, results: dict):
+    try:
+        from app.ml_engine import MLThreatDetector
+    except ImportError as e:
+        print(f"skipping ml: {e}")
+        return
+    detector = MLThreatDetector()
+    batches = [generator.take(batch_size) for _ in range(max(1, events // batch_size))]
+    for batch in batches:
+        for event in batch:
+            event["service"] = event["service"].upper()
+    detector.predict_batch(batches[0])
+
+    latencies = []
+    start = time.perf_counter()
+    for batch in batches:
+        t = time.perf_counter()
+        detector.predict_batch(batch)
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    # Separate pass: tracemalloc would distort the timings above
+    tracemalloc.start()
+    detector.predict_batch(batches[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results["ml_events_per_sec"] = round(len(batches) * batch_size / elapsed, 1)
+    results["ml_peak_mb"] = round(peak / 1024 / 1024, 1)
+    _latency_summary("ml_batch", latencies, results)
+
+
+# ====================================
+# RESULTS
+# ====================================
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_sec") or metric.endswith("_ratio")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Metrics that got worse than baseline by more than `threshold` (fraction)"""
+    regressions = []
+    for metric, value in sorted(current.items()):
+        old = baseline.get(metric)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+        change = (value - old) / old
+        worse = -change if _higher_is_better(metric) else change
+        flag = "REGRESSION" if worse > threshold else ""
+        print(f"  {metric:40s} {old:>12} -> {value:>12}  {change:+7.1%} {flag}")
+        if flag:
+            regressions.append(metric)
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _latest_results():
+    files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    return files[-1] if files else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HoneyCloud-X benchmark suite")
+    parser.add_argument("--events", type=int, default=20000, help="Events to ingest before read benchmarks")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent API readers")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per API reader per endpoint")
+    parser.add_argument("--subscribers", type=int, default=20, help="SSE clients")
+    parser.add_argument("--sse-events", type=int, default=200)
+    parser.add_argument("--only", default=",".join(SECTIONS), help="Comma-separated sections to run")
+    parser.add_argument("--compare", help='Results file to compare against, or "latest"')
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression (fraction)")
+    args = parser.parse_args()
+
+    sections = set(args.only.split(","))
+    baseline_path = _latest_results() if args.compare == "latest" else args.compare
+    generator = TrafficGenerator(seed=args.seed)
+    results = {}
+
+    server_sections = sections - {"ml"}
+    if server_sections:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=dict(os.environ, HONEYCLOUD_ALERTS="0"),
+        )
+        try:
+            _wait_for(f"{BASE_URL}/ready", time.perf_counter() + TIMEOUT)
+            results["server_idle_rss_mb"] = _rss_mb(proc.pid)
+            token = login(BASE_URL, "admin", "admin123")
+            if server_sections & {"ingest", "api", "reports"}:
+                bench_ingest(token, generator, args.events, args.batch_size, results)
+                # Let the pipeline drain before measuring reads and memory
+                time.sleep(2.0)
+                results["server_loaded_rss_mb"] = _rss_mb(proc.pid)
+            if "api" in sections:
+                bench_api(token, args.clients, args.requests, results)
+            if "sse" in sections:
+                bench_sse(token, generator, args.subscribers, args.sse_events, results)
+            if "reports" in sections:
+                bench_reports(token, results)
+            results["server_final_rss_mb"] = _rss_mb(proc.pid)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    if "ml" in sections:
+        bench_ml(generator, args.events, args.batch_size, results)
+
+    for metric, value in results.items():
+        print(f"{metric:40s} {value}")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "args": vars(args),
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"results saved to {path}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+        print(f"compared with {baseline_path}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Cluster mode tests: sensors forwarding to an in-process aggregator over
+LocalTransport, including lost acknowledgements, restarts and bad input.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import asyncio
+import json
+import random
+
+from app.cluster import Aggregator, ClusterError, Forwarder, LocalTransport, compress
+
+
+def _event(sensor: str, i: int) -> bytes:
+    return json.dumps({
+        'id': i, 'source_ip': f"10.0.{i % 256}.{i // 256 % 256}", 'source_port': 1024 + i,
+        'service': 'SSH', 'severity': 'LOW', 'ai_label': 'benign', 'threat_score': 0.1,
+        'sensor_id': sensor,
+    }).encode()
+
+
+class Store:
+    """Aggregator sink recording what would reach the persist stage"""
+
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, events):
+        self.events.extend(events)
+
+    def keys(self):
+        return [(e['node_id'], e['sensor_id'], e['sensor_event_id']) for e in self.events]
+
+
+class FlakyTransport(LocalTransport):
+    """Fails some sends outright and loses the acknowledgement of others"""
+
+    def __init__(self, aggregator, rng):
+        super().__init__(aggregator)
+        self.rng = rng
+
+    async def send(self, node_id, seq, body, encoding, epoch=''):
+        roll = self.rng.random()
+        if roll < 0.2:
+            raise ClusterError("connection refused")
+        ack = await super().send(node_id, seq, body, encoding, epoch)
+        if roll < 0.4:
+            raise ClusterError("connection reset before the ack")
+        return ack
+
+
+async def _drain(forwarder: Forwarder):
+    while forwarder.has_pending():
+        await forwarder.flush()
+
+
+def test_flaky_links_deliver_every_event_exactly_once():
+    async def run():
+        store = Store()
+        aggregator = Aggregator(store)
+        rng = random.Random(7)
+        forwarders = [Forwarder(f"sensor-{n}", FlakyTransport(aggregator, rng), batch_size=50) for n in range(4)]
+        for n, forwarder in enumerate(forwarders):
+            forwarder.enqueue([_event(f"s{n}", i) for i in range(1000)])
+        await asyncio.gather(*(_drain(f) for f in forwarders))
+        return store, aggregator
+
+    store, aggregator = asyncio.run(run())
+    assert len(store.events) == 4000
+    assert len(set(store.keys())) == 4000
+    summary = aggregator.summary()
+    assert summary['events'] == 4000
+    assert sum(n['duplicate_batches'] for n in summary['per_node']) > 0
+
+
+def test_restarted_sensor_is_not_treated_as_retrying():
+    async def run():
+        store = Store()
+        transport = LocalTransport(Aggregator(store))
+        first = Forwarder('sensor', transport, batch_size=2)
+        first.enqueue([_event('a', i) for i in range(6)])
+        await _drain(first)
+        # New process: sequence numbers start again at 1 under a new epoch
+        second = Forwarder('sensor', transport, batch_size=2)
+        second.enqueue([_event('b', i) for i in range(4)])
+        await _drain(second)
+        return store, transport.aggregator
+
+    store, aggregator = asyncio.run(run())
+    assert len(store.events) == 10
+    rollup = aggregator.nodes['sensor']
+    assert rollup.duplicates == 0
+    assert rollup.restarts == 1
+
+
+def test_overflow_during_send_keeps_unsent_events():
+    class SlowTransport:
+        def __init__(self):
+            self.gate = asyncio.Event()
+            self.sent = []
+
+        async def send(self, node_id, seq, body, encoding, epoch=''):
+            await self.gate.wait()
+            self.sent.append(seq)
+
+    async def run():
+        transport = SlowTransport()
+        forwarder = Forwarder('sensor', transport, batch_size=3, max_pending=3)
+        forwarder.enqueue([b'old0', b'old1', b'old2'])
+        flush = asyncio.create_task(forwarder.flush())
+        await asyncio.sleep(0)
+        forwarder.enqueue([b'new0', b'new1', b'new2'])
+        transport.gate.set()
+        await flush
+        return forwarder
+
+    forwarder = asyncio.run(run())
+    assert list(forwarder._pending) == [b'new0', b'new1', b'new2']
+    assert forwarder.dropped == 0
+    assert forwarder.sent_events == 3
+
+
+def test_malformed_events_are_rejected_before_rollups():
+    async def run():
+        store = Store()
+        aggregator = Aggregator(store)
+        lines = [
+            _event('a', 1),
+            b'"not an object"',
+            b'{broken json',
+            json.dumps({'source_ip': '1.2.3.4', 'service': 'SSH', 'severity': 'LOW',
+                        'source_port': '22'}).encode(),
+            _event('a', 2),
+        ]
+        body, encoding = compress(b'\n'.join(lines))
+        ack = await aggregator.receive('sensor', 1, body, encoding, 'epoch')
+        return store, aggregator, ack
+
+    store, aggregator, ack = asyncio.run(run())
+    assert ack['accepted'] == 2 and ack['rejected'] == 3
+    assert [e['sensor_event_id'] for e in store.events] == [1, 2]
+    assert aggregator.nodes['sensor'].events == 2
+    assert aggregator.nodes['sensor'].rejected == 3
+
+
+def test_undecodable_batch_is_dropped_instead_of_retried_forever():
+    async def run():
+        store = Store()
+        transport = LocalTransport(Aggregator(store))
+        forwarder = Forwarder('sensor', transport, batch_size=2)
+        forwarder.enqueue([_event('a', i) for i in range(4)])
+
+        # First batch goes out with an encoding the aggregator cannot read
+        async def send(node_id, seq, body, encoding, epoch=''):
+            return await LocalTransport.send(transport, node_id, seq, body,
+                                             'bogus' if seq == 1 else encoding, epoch)
+        transport.send = send
+        await _drain(forwarder)
+        return store, forwarder
+
+    store, forwarder = asyncio.run(run())
+    assert forwarder.rejected_batches == 1
+    assert forwarder.dropped == 2
+    assert [e['sensor_event_id'] for e in store.events] == [2, 3]